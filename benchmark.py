@@ -0,0 +1,217 @@
+"""Benchmark suite for the model engines and the Streamlit app.
+
+Each engine is timed in scalar form (a Python loop of single-point calls,
+as the pages make them) and in batch form (one call on arrays), at 1, 1k
+and 1M points. Every case reports the best wall time, throughput and the
+peak memory allocated during one call. App cases time a first render and
+a warm rerun of each page of home.py through Streamlit's test harness.
+
+    python benchmark.py                 # run and compare against the baseline
+    python benchmark.py --save          # run and store the results as the baseline
+    python benchmark.py --only valve    # cases whose name contains "valve"
+
+A case is a regression when it is more than --tolerance times (and over
+0.1 ms) slower than its baseline; the exit status is then non-zero. Baselines are machine
+specific, so refresh them with --save on the machine that runs the check.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from kohler_model import (calculate_valve, faucet_mix, flow_curve, get_temp_drop,
+                          hose_heat_loss, prv_placement, shower_outlet_temp)
+from kohler_model.thermostatic import OUTLET_TYPES, MIXING
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, "bench_baseline.json")
+SIZES = [1, 1000, 1000000]
+SCALAR_MAX = 1000  # scalar loops above this size take minutes
+MIN_TIME = 0.2     # s, keep repeating fast cases until this much time has run
+CURVE_ANGLES = 50
+NOISE = 1e-4       # s, slowdowns smaller than this are timer noise, not regressions
+
+
+def _faucet_inputs(rng, n):
+    return (rng.uniform(40, 80, n), rng.uniform(5, 25, n), rng.uniform(0, 10, n),
+            rng.uniform(0, 10, n), rng.uniform(-45, 45, n))
+
+
+def _valve_inputs(rng, n):
+    return (rng.uniform(0.5, 8, n), rng.uniform(0.5, 8, n), rng.uniform(40, 80, n),
+            rng.uniform(5, 25, n), rng.uniform(-45, 45, n), rng.choice(["Spout", "Shower"], n),
+            rng.uniform(0.1, 5, n), rng.uniform(10, 25, n))
+
+
+# engine -> (function of the generated columns, input generator); one point per row
+ENGINES = {
+    "faucet_mix": (lambda *c: faucet_mix(*c, "26mm"), _faucet_inputs),
+    # one row is a pressure pair, i.e. a curve of CURVE_ANGLES points
+    "flow_curve": (lambda Ph, Pc, Th, Tc: flow_curve(Ph, Pc, "26mm", CURVE_ANGLES,
+                                                     hot_temp=Th, cold_temp=Tc),
+                   lambda rng, n: (rng.uniform(0, 10, n), rng.uniform(0, 10, n),
+                                   rng.uniform(40, 80, n), rng.uniform(5, 25, n))),
+    "calculate_valve": (lambda *c: calculate_valve(*c, model="AT360"), _valve_inputs),
+    "shower_outlet_temp": (shower_outlet_temp,
+                           lambda rng, n: (rng.uniform(30, 50, n), rng.uniform(1, 5, n),
+                                           rng.uniform(0.5, 2, n), rng.integers(10, 200, n),
+                                           rng.uniform(10, 30, n))),
+    "get_temp_drop": (lambda o, L, a: get_temp_drop(o, L, MIXING, a),
+                      lambda rng, n: (rng.choice(OUTLET_TYPES, n), rng.uniform(1, 6, n),
+                                      rng.random(n) < 0.5)),
+    "prv_placement": (prv_placement,
+                      lambda rng, n: (rng.uniform(10, 500, n), rng.uniform(5, 60, n),
+                                      rng.uniform(0.5, 5, n))),
+    "hose_heat_loss": (hose_heat_loss,
+                       lambda rng, n: (rng.uniform(30, 80, n), rng.uniform(5, 35, n),
+                                       rng.uniform(0.5, 3, n), rng.uniform(1, 20, n))),
+}
+
+# page -> (session page, selectbox choice or None)
+PAGES = {
+    "home": ("home", None),
+    "faucet 26mm": ("faucet", "26mm"),
+    "faucet 28mm": ("faucet", "28mm"),
+    "faucet 35mm": ("faucet", "35mm"),
+    "valve AT235": ("valve", "AT235"),
+    "valve AT360": ("valve", "AT360"),
+    "valve Thermostatic": ("valve", "Thermostatic"),
+    "shower": ("shower", None),
+    "prv": ("prv", None),
+}
+
+
+def _best_time(call):
+    best, total, runs = float("inf"), 0.0, 0
+    while runs < 3 or (total < MIN_TIME and runs < 10000):
+        start = time.perf_counter()
+        call()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        runs += 1
+    return best
+
+
+def _peak_mb(call):
+    tracemalloc.start()
+    try:
+        call()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def engine_cases(sizes):
+    """Yield (name, call, points) for every engine, form and size."""
+    for engine, (func, make_inputs) in ENGINES.items():
+        for n in sizes:
+            rows_for_n = max(1, n // CURVE_ANGLES) if engine == "flow_curve" else n
+            columns = make_inputs(np.random.default_rng(0), rows_for_n)
+            yield f"{engine}/batch/{n}", (lambda f=func, c=columns: f(*c)), n
+            if n <= SCALAR_MAX:
+                rows = [tuple(col[i] for col in columns) for i in range(rows_for_n)]
+                yield f"{engine}/scalar/{n}", (lambda f=func, r=rows: [f(*row) for row in r]), n
+
+
+def run_engines(sizes, only):
+    results = {}
+    for name, call, points in engine_cases(sizes):
+        if only and only not in name:
+            continue
+        seconds = _best_time(call)
+        results[name] = {"seconds": seconds, "throughput": points / seconds,
+                         "peak_mb": _peak_mb(call)}
+        _report(name, results[name])
+    return results
+
+
+def run_app(only):
+    """First render and warm rerun of every page through AppTest."""
+    from streamlit.testing.v1 import AppTest
+
+    os.environ.setdefault("KOHLER_TIMING_LOG", "")  # keep benchmark reruns out of the timing log
+    results = {}
+    for label, (page, choice) in PAGES.items():
+        if only and only not in f"app/{label}":
+            continue
+        at = AppTest.from_file(os.path.join(HERE, "home.py"), default_timeout=60)
+        at.session_state["start"] = True
+        at.session_state["splash_shown"] = True
+        at.session_state["page"] = page
+
+        start = time.perf_counter()
+        at.run()
+        if choice is not None:
+            at.selectbox[0].select(choice).run()
+        first = time.perf_counter() - start
+        rerun = _best_time(at.run)
+        if at.exception:
+            raise RuntimeError(f"{label} page raised: {at.exception[0].value}")
+
+        for kind, seconds in (("first", first), ("rerun", rerun)):
+            name = f"app/{label}/{kind}"
+            results[name] = {"seconds": seconds, "throughput": 1 / seconds, "peak_mb": None}
+            _report(name, results[name])
+    return results
+
+
+def _report(name, result):
+    peak = "" if result["peak_mb"] is None else f"{result['peak_mb']:9.1f} MB"
+    print(f"{name:<36} {result['seconds'] * 1000:11.3f} ms {result['throughput']:14,.0f} /s {peak}")
+
+
+def compare(results, baseline, tolerance):
+    """Names of the cases more than tolerance times slower than the baseline."""
+    slower = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base and result["seconds"] > max(tolerance * base["seconds"], base["seconds"] + NOISE):
+            slower.append(name)
+            print(f"REGRESSION {name}: {result['seconds'] * 1000:.3f} ms vs "
+                  f"baseline {base['seconds'] * 1000:.3f} ms")
+    return slower
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the model engines and app pages.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="points per case")
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--no-app", action="store_true", help="skip the Streamlit page reruns")
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file (default: %(default)s)")
+    parser.add_argument("--tolerance", type=float, default=2.0,
+                        help="slowdown factor over the baseline that counts as a regression")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run_engines(args.sizes, args.only)
+    if not args.no_app:
+        results.update(run_app(args.only))
+
+    if args.save:
+        meta = {"python": platform.python_version(), "numpy": np.__version__,
+                "machine": platform.machine(), "system": platform.system()}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("no baseline yet; run with --save to store one")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    return 1 if compare(results, baseline, args.tolerance) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""Faucet page charts.
+
+Drawn on bare matplotlib Figure objects, which pyplot never registers, so
+nothing piles up in a long-running server, and cached as PNG bytes per
+input so a rerun that leaves a chart unchanged reuses the rendered image.
+"""
+import io
+
+import streamlit as st
+from matplotlib.figure import Figure
+
+
+def _png(fig):
+    # Same output st.pyplot would produce
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=200, bbox_inches="tight")
+    return buf.getvalue()
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def temp_bar_png(T_mixed, color):
+    fig = Figure(figsize=(1.1, 2))
+    ax = fig.subplots()
+    ax.bar(1, T_mixed, width=0.3, color=color)
+    ax.set_ylim(0, 100)
+    ax.set_xticks([]); ax.set_yticks([0, 50, 100])
+    ax.set_title('Temp', fontsize=7)
+    ax.set_ylabel('°C', fontsize=7)
+    ax.tick_params(labelsize=6)
+    return _png(fig)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def flow_curve_png(angles, flows):
+    fig = Figure(figsize=(3, 1.8))
+    ax2 = fig.subplots()
+    ax2.plot(angles, flows, 'b-o', linewidth=1.4, markersize=3)
+    ax2.set_xlabel('Angle (°)', fontsize=7)
+    ax2.set_ylabel('Flow (LPM)', fontsize=7)
+    ax2.set_title('Flow Curve', fontsize=8)
+    ax2.tick_params(labelsize=6)
+    ax2.set_xlim([-50, 50])
+    ax2.set_ylim([0, flows.max() * 1.1])
+    ax2.grid(True, linewidth=0.4)
+    return _png(fig)
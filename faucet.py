@@ -1,7 +1,9 @@
 import streamlit as st
-import matplotlib.pyplot as plt
 import numpy as np
 
+from charts import flow_curve_png, temp_bar_png
+from kohler_model import faucet_mix, flow_curve
+
 # --- Page setup ---
 st.set_page_config(page_title="Faucet Model", page_icon="🚰", layout="centered")
 
@@ -37,30 +39,7 @@ with col_img:
     st.image("L.png", width=100, caption="Faucet for Lever Reference")
 
 # --- Physics calculation ---
-rho = 980
-A_max = 7e-3
-C_d = 1.0
-lever = (45 - lever_angle) / 90
-
-A_hot = lever * A_max
-A_cold = (1 - lever) * A_max
-
-P_hot = hot_pressure * 1e5
-P_cold = cold_pressure * 1e5
-
-deltaP_hot = max(P_hot, 1e4)
-deltaP_cold = max(P_cold, 1e4)
-
-m_dot_hot = C_d * A_hot * np.sqrt(2 * rho * deltaP_hot)
-m_dot_cold = C_d * A_cold * np.sqrt(2 * rho * deltaP_cold)
-m_dot_total = m_dot_hot + m_dot_cold
-
-if m_dot_total < 1e-6:
-    T_mixed = (hot_temp + cold_temp) / 2
-    flow_LPM = 0
-else:
-    T_mixed = (m_dot_hot * hot_temp + m_dot_cold * cold_temp) / m_dot_total
-    flow_LPM = (m_dot_total / rho) * 60
+T_mixed, flow_LPM = faucet_mix(hot_temp, cold_temp, hot_pressure, cold_pressure, lever_angle, "26mm")
 
 # --- Output metrics ---
 st.markdown("---")
@@ -85,18 +64,7 @@ def get_temp_color(temp):
         return (1, 0.5 - 0.5 * frac, 0)
 
 # --- Flow curve ---
-angles = np.linspace(-45, 45, 50)
-flows = []
-for angle in angles:
-    lever_local = (45 - angle) / 90
-    A_hot_local = lever_local * A_max
-    A_cold_local = (1 - lever_local) * A_max
-
-    m_dot_hot_local = C_d * A_hot_local * np.sqrt(2 * rho * deltaP_hot)
-    m_dot_cold_local = C_d * A_cold_local * np.sqrt(2 * rho * deltaP_cold)
-    m_dot_total_local = m_dot_hot_local + m_dot_cold_local
-    flow_local = (m_dot_total_local / rho) * 60
-    flows.append(flow_local)
+angles, flows = flow_curve(hot_pressure, cold_pressure, "26mm", hot_temp=hot_temp, cold_temp=cold_temp)
 
 # --- Compact side-by-side plots ---
 st.markdown("#### 📊 Visual Output")
@@ -105,28 +73,12 @@ col_plot1, col_plot2 = st.columns([1, 2])
 
 # --- Thermocolor Bar
 with col_plot1:
-    fig, ax = plt.subplots(figsize=(1.1, 2))
-    ax.bar(1, T_mixed, width=0.3, color=get_temp_color(T_mixed))
-    ax.set_ylim(0, 100)
-    ax.set_xticks([])
-    ax.set_yticks([0, 50, 100])
-    ax.set_title('Temp', fontsize=7)
-    ax.set_ylabel('°C', fontsize=7)
-    ax.tick_params(labelsize=6)
-    st.pyplot(fig, use_container_width=False)
+    T_bar = round(float(T_mixed), 1)  # one value for the bar and its colour (both cache keys)
+    st.image(temp_bar_png(T_bar, get_temp_color(T_bar)))
 
 # --- Flow vs Lever Plot
 with col_plot2:
-    fig2, ax2 = plt.subplots(figsize=(3, 1.8))
-    ax2.plot(angles, flows, 'b-o', linewidth=1.4, markersize=3)
-    ax2.set_xlabel('Angle (°)', fontsize=7)
-    ax2.set_ylabel('Flow (LPM)', fontsize=7)
-    ax2.set_title('Flow Curve', fontsize=8)
-    ax2.tick_params(labelsize=6)
-    ax2.set_xlim([-50, 50])
-    ax2.set_ylim([0, max(flows) * 1.1])
-    ax2.grid(True, linewidth=0.4)
-    st.pyplot(fig2, use_container_width=False)
+    st.image(flow_curve_png(angles, flows))
 
 st.markdown("---")
 st.caption("Created by Vigyan Lal💧")
@@ -0,0 +1,46 @@
+"""Valve page lever gauges.
+
+The lever slider moves in whole degrees, so there are only 91 gauges per
+style: each is built once per server process and shared by every session,
+and a slider move just looks its figure up instead of building and
+validating a new one. The gauge colours are all explicit, so the figures
+carry the empty "none" template rather than the colour-scale template
+Streamlit installs as the Plotly default, which cuts the spec sent to the
+browser on every interaction from about 3.8 kB to 0.4 kB.
+"""
+import plotly.graph_objects as go
+import streamlit as st
+
+# style -> title, step colours (below and above 0°), size (px) and margins
+GAUGE_STYLES = {
+    "page": {"title": "", "steps": ("indianred", "lightblue"), "size": 200,
+             "margin": dict(l=0, r=0, t=0, b=0)},
+    "standalone": {"title": "Lever Angle", "steps": ("lightblue", "lightgreen"), "size": 220,
+                   "margin": dict(l=10, r=10, t=30, b=10)},
+}
+
+
+@st.cache_resource(max_entries=512, show_spinner=False)
+def lever_gauge(theta, style="page"):
+    s = GAUGE_STYLES[style]
+    title = {'text': s["title"], 'font': {'size': 16}} if s["title"] else {'text': ""}
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=theta,
+        title=title,
+        gauge={
+            'axis': {'range': [-45, 45]},
+            'bar': {'color': "darkblue"},
+            'steps': [
+                {'range': [-45, 0], 'color': s["steps"][0]},
+                {'range': [0, 45], 'color': s["steps"][1]}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 2},
+                'thickness': 0.75,
+                'value': theta
+            }
+        }
+    ))
+    fig.update_layout(height=s["size"], width=s["size"], margin=s["margin"], template="none")
+    return fig
@@ -1,23 +1,24 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-import math
-import plotly.graph_objects as go
-import time
 import base64
 
+from kohler_model import session_models
+from kohler_model.prv import STATUS_MESSAGES, prv_status
+from telemetry import Rerun, TimedModels, summary
+
 # ✅ SET PAGE FIRST
 st.set_page_config(page_title="Kohler Performance", page_icon="💧", layout="centered")
 
-# Load assets
+# Latency spans of this rerun (see telemetry.py); finish() it before every
+# st.rerun() / st.stop() as well as at the end, or early exits go unrecorded
+rerun = Rerun()
+
+# Load assets (read and encoded once per server process, shared by every session)
+@st.cache_resource(show_spinner=False)
 def load_base64(path):
     with open(path, "rb") as f:
         return base64.b64encode(f.read()).decode()
 
-gif_b64 = load_base64("kohler_loading.gif")
-mp3_b64 = load_base64("netflix_intro.mp3")
-logo_b64 = load_base64("logo.png")
-
 # 🌐 Add global styling
 st.markdown("""
     <style>
@@ -59,57 +60,69 @@ if "start" not in st.session_state:
     st.session_state.start = False
 
 if not st.session_state.start:
+    rerun.page = "start"
     st.markdown("<div class='center-container'>", unsafe_allow_html=True)
     if st.button("Click to Start"):
         st.session_state.start = True
+        rerun.finish()
         st.rerun()
     st.markdown("</div>", unsafe_allow_html=True)
+    rerun.finish()
     st.stop()
 
-# Splash screen with audio
-st.markdown(f"""
-    <style>
-    #splash {{
-        position: fixed;
-        top: 0; left: 0;
-        width: 100vw; height: 100vh;
-        background: black;
-        z-index: 9999;
-        display: flex;
-        flex-direction: column;
-        justify-content: center;
-        align-items: center;
-        animation: fadeOut 1s ease-out 3.2s forwards;
-    }}
-    #splash-logo {{
-        width: 300px;
-        animation: grow 3s ease-in-out forwards;
-    }}
-    #splash-text {{
-        color: white;
-        margin-top: 20px;
-        font-size: 20px;
-    }}
-    @keyframes grow {{
-        0% {{ transform: scale(1.0); opacity: 0; }}
-        50% {{ transform: scale(1.3); opacity: 0.8; }}
-        100% {{ transform: scale(1.6); opacity: 1; }}
-    }}
-    @keyframes fadeOut {{
-        to {{ opacity: 0; visibility: hidden; }}
-    }}
-    </style>
+# Splash screen with audio, shown once per session. The overlay fades itself out
+# in CSS, so the page underneath renders straight away instead of waiting on it.
+if not st.session_state.get("splash_shown"):
+    st.session_state.splash_shown = True
+    with rerun.span("assets"):
+        gif_b64 = load_base64("kohler_loading.gif")
+        mp3_b64 = load_base64("netflix_intro.mp3")
+    st.markdown(f"""
+        <style>
+        #splash {{
+            position: fixed;
+            top: 0; left: 0;
+            width: 100vw; height: 100vh;
+            background: black;
+            z-index: 9999;
+            display: flex;
+            flex-direction: column;
+            justify-content: center;
+            align-items: center;
+            animation: fadeOut 1s ease-out 3.2s forwards;
+        }}
+        #splash-logo {{
+            width: 300px;
+            animation: grow 3s ease-in-out forwards;
+        }}
+        #splash-text {{
+            color: white;
+            margin-top: 20px;
+            font-size: 20px;
+        }}
+        @keyframes grow {{
+            0% {{ transform: scale(1.0); opacity: 0; }}
+            50% {{ transform: scale(1.3); opacity: 0.8; }}
+            100% {{ transform: scale(1.6); opacity: 1; }}
+        }}
+        @keyframes fadeOut {{
+            to {{ opacity: 0; visibility: hidden; }}
+        }}
+        </style>
 
-    <div id="splash">
-        <img id="splash-logo" src="data:image/gif;base64,{gif_b64}">
-        <div id="splash-text">Performance Model</div>
-        <audio id="intro-audio" autoplay>
-            <source src="data:audio/mp3;base64,{mp3_b64}" type="audio/mp3">
-        </audio>
-    </div>
-""", unsafe_allow_html=True)
+        <div id="splash">
+            <img id="splash-logo" src="data:image/gif;base64,{gif_b64}">
+            <div id="splash-text">Performance Model</div>
+            <audio id="intro-audio" autoplay>
+                <source src="data:audio/mp3;base64,{mp3_b64}" type="audio/mp3">
+            </audio>
+        </div>
+    """, unsafe_allow_html=True)
 
-time.sleep(3.5)
+# Memoized model functions, one bounded LRU cache per session
+if "models" not in st.session_state:
+    st.session_state.models = session_models()
+models = TimedModels(st.session_state.models, rerun)
 
 # --- Sidebar Navigation or Button Logic ---
 if 'page' not in st.session_state:
@@ -210,18 +223,22 @@ if st.session_state.page == 'home':
 
     with col1:
         if st.button("🚿 Shower Model"):
+            rerun.finish()
             st.session_state.page = "shower"
             st.rerun()
     with col2:
         if st.button("🔧 Valve Model"):
+            rerun.finish()
             st.session_state.page = "valve"
             st.rerun()
     with col3:
         if st.button("🚰 Faucet Model"):
+            rerun.finish()
             st.session_state.page = "faucet"
             st.rerun()
     with col4:
         if st.button("📉 PRV Placement"):
+            rerun.finish()
             st.session_state.page = "prv"
             st.rerun()
 
@@ -233,6 +250,8 @@ if st.session_state.page == 'home':
         </div>
     """, unsafe_allow_html=True)
 
+    with rerun.span("assets"):
+        logo_b64 = load_base64("logo.png")
     st.markdown(f"""
         <style>
         .bottom-right-logo {{
@@ -252,9 +271,14 @@ if st.session_state.page == 'home':
         
 # === FAUCET MODEL PAGE ===
 elif st.session_state.page == 'faucet':
+    # Matplotlib loads on a faucet page's first render, not on every cold start
+    with rerun.span("imports"):
+        from charts import flow_curve_png, temp_bar_png
+
     st.title("🚰 Faucet Modelling")
 
     model_choice = st.selectbox("Choose Cartridge Size:", ["26mm", "28mm", "35mm"], index=0)
+    rerun.page = f"faucet {model_choice}"
 
     if model_choice == "26mm":
         st.subheader("🚰 26mm")
@@ -281,33 +305,20 @@ elif st.session_state.page == 'faucet':
             st.image("L.png", width=100, caption="Lever Reference")
 
         # Calculations
-        rho = 980
-        A_max = 7e-3
-        C_d = 1.0
-        lever = (45 - lever_angle) / 90
-
-        A_hot = lever * A_max
-        A_cold = (1 - lever) * A_max
-        P_hot = hot_pressure * 1e5
-        P_cold = cold_pressure * 1e5
-        deltaP_hot = max(P_hot, 1e4)
-        deltaP_cold = max(P_cold, 1e4)
-
-        m_dot_hot = C_d * A_hot * np.sqrt(2 * rho * deltaP_hot)
-        m_dot_cold = C_d * A_cold * np.sqrt(2 * rho * deltaP_cold)
-        m_dot_total = m_dot_hot + m_dot_cold
-
-        if m_dot_total < 1e-6:
-            T_mixed = (hot_temp + cold_temp) / 2
-            flow_LPM = 0
-        else:
-            T_mixed = (m_dot_hot * hot_temp + m_dot_cold * cold_temp) / m_dot_total
-            flow_LPM = (m_dot_total / rho) * 60
+        T_mixed, flow_LPM = models.faucet_mix(hot_temp, cold_temp, hot_pressure, cold_pressure, lever_angle, "26mm")
 
         col3, col4 = st.columns(2)
         col3.metric("🌡️ Outlet Temp", f"{T_mixed:.1f} °C")
         col4.metric("🚿 Flow Rate", f"{flow_LPM:.2f} LPM")
 
+        with st.expander("🎯 Lever angle for a target temperature"):
+            target_temp = st.number_input("Target Outlet Temp (°C)", value=40.0, step=0.5, key="target_faucet")
+            target_angle, target_flow = models.faucet_angle_for_temp(target_temp, hot_temp, cold_temp, hot_pressure, cold_pressure, "26mm")
+            if np.isnan(target_angle):
+                st.warning(f"⚠️ {target_temp:.1f} °C is outside the {min(hot_temp, cold_temp)}–{max(hot_temp, cold_temp)} °C these inlets can mix")
+            else:
+                st.success(f"Set the lever to **{target_angle:.1f}°** for {target_temp:.1f} °C at **{target_flow:.2f} LPM**")
+
         # Aerator Selection Section
         st.markdown("### 💦 Select Aerator Type")
 
@@ -348,40 +359,19 @@ elif st.session_state.page == 'faucet':
                 frac = (T-75)/25
                 return (1, 0, 0)
 
-        angles = np.linspace(-45, 45, 50)
-        flows = []
-        for angle in angles:
-            lever_local = (45 - angle) / 90
-            A_hot_local = lever_local * A_max
-            A_cold_local = (1 - lever_local) * A_max
-            m_hot = C_d * A_hot_local * np.sqrt(2 * rho * deltaP_hot)
-            m_cold = C_d * A_cold_local * np.sqrt(2 * rho * deltaP_cold)
-            m_total = m_hot + m_cold
-            flows.append((m_total / rho) * 60)
+        angles, flows = models.flow_curve(hot_pressure, cold_pressure, "26mm", hot_temp=hot_temp, cold_temp=cold_temp)
 
         st.markdown("#### 📊 Visual Output")
         col_plot1, col_plot2 = st.columns([1, 2])
 
         with col_plot1:
-            fig, ax = plt.subplots(figsize=(1.1, 2))
-            ax.bar(1, T_mixed, width=0.3, color=get_temp_color(T_mixed))
-            ax.set_ylim(0, 100)
-            ax.set_xticks([]); ax.set_yticks([0, 50, 100])
-            ax.set_title('Temp', fontsize=7)
-            ax.set_ylabel('°C', fontsize=7)
-            ax.tick_params(labelsize=6)
-            st.pyplot(fig, use_container_width=False)
+            with rerun.span("charts"):
+                T_bar = round(float(T_mixed), 1)  # one value for the bar and its colour (both cache keys)
+                st.image(temp_bar_png(T_bar, get_temp_color(T_bar)))
 
         with col_plot2:
-            fig2, ax2 = plt.subplots(figsize=(3, 1.8))
-            ax2.plot(angles, flows, 'b-o', linewidth=1.4, markersize=3)
-            ax2.set_xlabel('Angle (°)', fontsize=7)
-            ax2.set_ylabel('Flow (LPM)', fontsize=7)
-            ax2.set_title('Flow Curve', fontsize=8)
-            ax2.tick_params(labelsize=6)
-            ax2.set_xlim([-50, 50]); ax2.set_ylim([0, max(flows)*1.1])
-            ax2.grid(True, linewidth=0.4)
-            st.pyplot(fig2, use_container_width=False)
+            with rerun.span("charts"):
+                st.image(flow_curve_png(angles, flows))
 
         st.markdown("---")
 
@@ -410,34 +400,21 @@ elif st.session_state.page == 'faucet':
         with col_img:
             st.image("L.png", width=100, caption="Faucet for Lever Reference")
 
-        rho = 980
-        A_max = 8.5e-3
-        C_d = 1.0
-        lever = (45 - lever_angle) / 90
-
-        A_hot = lever * A_max
-        A_cold = (1 - lever) * A_max
-        P_hot = hot_pressure * 1e5
-        P_cold = cold_pressure * 1e5
-        deltaP_hot = max(P_hot, 1e4)
-        deltaP_cold = max(P_cold, 1e4)
-
-        m_dot_hot = C_d * A_hot * np.sqrt(2 * rho * deltaP_hot)
-        m_dot_cold = C_d * A_cold * np.sqrt(2 * rho * deltaP_cold)
-        m_dot_total = m_dot_hot + m_dot_cold
-
-        if m_dot_total < 1e-6:
-            T_mixed = (hot_temp + cold_temp) / 2
-            flow_LPM = 0
-        else:
-            T_mixed = (m_dot_hot * hot_temp + m_dot_cold * cold_temp) / m_dot_total
-            flow_LPM = (m_dot_total / rho) * 60
+        T_mixed, flow_LPM = models.faucet_mix(hot_temp, cold_temp, hot_pressure, cold_pressure, lever_angle, "28mm")
 
         st.markdown("---")
         col3, col4 = st.columns(2)
         col3.metric("🌡️ Outlet Temp", f"{T_mixed:.1f} °C")
         col4.metric("🚿 Flow Rate", f"{flow_LPM:.2f} LPM")
 
+        with st.expander("🎯 Lever angle for a target temperature"):
+            target_temp = st.number_input("Target Outlet Temp (°C)", value=40.0, step=0.5, key="target_faucet")
+            target_angle, target_flow = models.faucet_angle_for_temp(target_temp, hot_temp, cold_temp, hot_pressure, cold_pressure, "28mm")
+            if np.isnan(target_angle):
+                st.warning(f"⚠️ {target_temp:.1f} °C is outside the {min(hot_temp, cold_temp)}–{max(hot_temp, cold_temp)} °C these inlets can mix")
+            else:
+                st.success(f"Set the lever to **{target_angle:.1f}°** for {target_temp:.1f} °C at **{target_flow:.2f} LPM**")
+
         st.markdown("### 💦 Select Aerator Type")
 
 # Aerator specs (mid-range flow at 3 bar)
@@ -476,39 +453,18 @@ elif st.session_state.page == 'faucet':
                 frac = (T-75)/25
                 return (1, 0, 0)
 
-        angles = np.linspace(-45, 45, 50)
-        flows = []
-        for angle in angles:
-            lever_local = (45 - angle) / 90
-            A_hot_local = lever_local * A_max
-            A_cold_local = (1 - lever_local) * A_max
-            m_hot = C_d * A_hot_local * np.sqrt(2 * rho * deltaP_hot)
-            m_cold = C_d * A_cold_local * np.sqrt(2 * rho * deltaP_cold)
-            flows.append((m_hot + m_cold) / rho * 60)
+        angles, flows = models.flow_curve(hot_pressure, cold_pressure, "28mm", hot_temp=hot_temp, cold_temp=cold_temp)
 
         st.markdown("#### 📊 Visual Output")
         col_plot1, col_plot2 = st.columns([1, 2])
         with col_plot1:
-            fig, ax = plt.subplots(figsize=(1.1, 2))
-            ax.bar(1, T_mixed, width=0.3, color=get_temp_color(T_mixed))
-            ax.set_ylim(0, 100)
-            ax.set_xticks([]); ax.set_yticks([0, 50, 100])
-            ax.set_title('Temp', fontsize=7)
-            ax.set_ylabel('°C', fontsize=7)
-            ax.tick_params(labelsize=6)
-            st.pyplot(fig, use_container_width=False)
+            with rerun.span("charts"):
+                T_bar = round(float(T_mixed), 1)  # one value for the bar and its colour (both cache keys)
+                st.image(temp_bar_png(T_bar, get_temp_color(T_bar)))
 
         with col_plot2:
-            fig2, ax2 = plt.subplots(figsize=(3, 1.8))
-            ax2.plot(angles, flows, 'b-o', linewidth=1.4, markersize=3)
-            ax2.set_xlabel('Angle (°)', fontsize=7)
-            ax2.set_ylabel('Flow (LPM)', fontsize=7)
-            ax2.set_title('Flow Curve', fontsize=8)
-            ax2.tick_params(labelsize=6)
-            ax2.set_xlim([-50, 50])
-            ax2.set_ylim([0, max(flows)*1.1])
-            ax2.grid(True, linewidth=0.4)
-            st.pyplot(fig2, use_container_width=False)
+            with rerun.span("charts"):
+                st.image(flow_curve_png(angles, flows))
 
         st.markdown("---")
         st.caption("Created by Vigyan Lal💧")
@@ -538,34 +494,21 @@ elif st.session_state.page == 'faucet':
         with col_img:
             st.image("L.png", width=100, caption="Faucet for Lever Reference")
 
-        rho = 980
-        A_max = 15.75e-3
-        C_d = 1.0
-        lever = (45 - lever_angle) / 90
-
-        A_hot = lever * A_max
-        A_cold = (1 - lever) * A_max
-        P_hot = hot_pressure * 1e5
-        P_cold = cold_pressure * 1e5
-        deltaP_hot = max(P_hot, 1e4)
-        deltaP_cold = max(P_cold, 1e4)
-
-        m_dot_hot = C_d * A_hot * np.sqrt(2 * rho * deltaP_hot)
-        m_dot_cold = C_d * A_cold * np.sqrt(2 * rho * deltaP_cold)
-        m_dot_total = m_dot_hot + m_dot_cold
-
-        if m_dot_total < 1e-6:
-            T_mixed = (hot_temp + cold_temp) / 2
-            flow_LPM = 0
-        else:
-            T_mixed = (m_dot_hot * hot_temp + m_dot_cold * cold_temp) / m_dot_total
-            flow_LPM = (m_dot_total / rho) * 60
+        T_mixed, flow_LPM = models.faucet_mix(hot_temp, cold_temp, hot_pressure, cold_pressure, lever_angle, "35mm")
 
         st.markdown("---")
         col3, col4 = st.columns(2)
         col3.metric("🌡️ Outlet Temp", f"{T_mixed:.1f} °C")
         col4.metric("🚿 Flow Rate", f"{flow_LPM:.2f} LPM")
 
+        with st.expander("🎯 Lever angle for a target temperature"):
+            target_temp = st.number_input("Target Outlet Temp (°C)", value=40.0, step=0.5, key="target_faucet")
+            target_angle, target_flow = models.faucet_angle_for_temp(target_temp, hot_temp, cold_temp, hot_pressure, cold_pressure, "35mm")
+            if np.isnan(target_angle):
+                st.warning(f"⚠️ {target_temp:.1f} °C is outside the {min(hot_temp, cold_temp)}–{max(hot_temp, cold_temp)} °C these inlets can mix")
+            else:
+                st.success(f"Set the lever to **{target_angle:.1f}°** for {target_temp:.1f} °C at **{target_flow:.2f} LPM**")
+
         st.markdown("### 💦 Select Aerator Type")
 
 # Aerator specs (mid-range flow at 3 bar)
@@ -604,52 +547,36 @@ elif st.session_state.page == 'faucet':
                 frac = (T-75)/25
                 return (1, 0, 0)
 
-        angles = np.linspace(-45, 45, 50)
-        flows = []
-        for angle in angles:
-            lever_local = (45 - angle) / 90
-            A_hot_local = lever_local * A_max
-            A_cold_local = (1 - lever_local) * A_max
-            m_hot = C_d * A_hot_local * np.sqrt(2 * rho * deltaP_hot)
-            m_cold = C_d * A_cold_local * np.sqrt(2 * rho * deltaP_cold)
-            flows.append((m_hot + m_cold) / rho * 60)
+        angles, flows = models.flow_curve(hot_pressure, cold_pressure, "35mm", hot_temp=hot_temp, cold_temp=cold_temp)
 
         st.markdown("#### 📊 Visual Output")
         col_plot1, col_plot2 = st.columns([1, 2])
         with col_plot1:
-            fig, ax = plt.subplots(figsize=(1.1, 2))
-            ax.bar(1, T_mixed, width=0.3, color=get_temp_color(T_mixed))
-            ax.set_ylim(0, 100)
-            ax.set_xticks([]); ax.set_yticks([0, 50, 100])
-            ax.set_title('Temp', fontsize=7)
-            ax.set_ylabel('°C', fontsize=7)
-            ax.tick_params(labelsize=6)
-            st.pyplot(fig, use_container_width=False)
+            with rerun.span("charts"):
+                T_bar = round(float(T_mixed), 1)  # one value for the bar and its colour (both cache keys)
+                st.image(temp_bar_png(T_bar, get_temp_color(T_bar)))
 
         with col_plot2:
-            fig2, ax2 = plt.subplots(figsize=(3, 1.8))
-            ax2.plot(angles, flows, 'b-o', linewidth=1.4, markersize=3)
-            ax2.set_xlabel('Angle (°)', fontsize=7)
-            ax2.set_ylabel('Flow (LPM)', fontsize=7)
-            ax2.set_title('Flow Curve', fontsize=8)
-            ax2.tick_params(labelsize=6)
-            ax2.set_xlim([-50, 50])
-            ax2.set_ylim([0, max(flows)*1.1])
-            ax2.grid(True, linewidth=0.4)
-            st.pyplot(fig2, use_container_width=False)
+            with rerun.span("charts"):
+                st.image(flow_curve_png(angles, flows))
 
         st.markdown("---")
         st.caption("Created by Vigyan Lal💧")
 
     if st.button("🔙 Back to Home"):
+        rerun.finish()
         st.session_state.page = 'home'
         st.rerun()
 
 # === VALVE MODEL PAGE ===
 elif st.session_state.page == 'valve':
+    with rerun.span("imports"):
+        from gauges import lever_gauge
+
     st.title("🚰 Valve Model")
 
     model_choice = st.selectbox("Choose Valve:", ["AT235", "AT360", "Thermostatic"], index=0)
+    rerun.page = f"valve {model_choice}"
 
     if model_choice == "AT360":
         st.subheader("🚰 AQUA TURBO 360")
@@ -678,26 +605,8 @@ elif st.session_state.page == 'valve':
             st.markdown("</div>", unsafe_allow_html=True)
 
         with col_gauge:
-            fig = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=theta,
-                title={'text': ""},
-                gauge={
-                    'axis': {'range': [-45, 45]},
-                    'bar': {'color': "darkblue"},
-                    'steps': [
-                        {'range': [-45, 0], 'color': "indianred"},
-                        {'range': [0, 45], 'color': "lightblue"}
-                    ],
-                    'threshold': {
-                        'line': {'color': "red", 'width': 2},
-                        'thickness': 0.75,
-                        'value': theta
-                    }
-                }
-            ))
-            fig.update_layout(height=200, width=200, margin=dict(l=0, r=0, t=0, b=0))
-            st.plotly_chart(fig, use_container_width=False)
+            with rerun.span("gauge"):
+                st.plotly_chart(lever_gauge(theta), use_container_width=False)
 
         with col_image:
             st.markdown("<div style='text-align:center; padding-top: 35px;'>", unsafe_allow_html=True)
@@ -709,70 +618,8 @@ elif st.session_state.page == 'valve':
             st.image("Valve_Shower.png", width=130, caption="Length of Pipe from Valve to Shower")
             st.markdown("</div>", unsafe_allow_html=True)
 
-    # Calculation inside Valve
-        def calculate_valve(hotP, coldP, hotT, coldT, theta, outletChoice, pipeLen, pipeDia):
-            rho = 1000
-            g = 9.81
-            D_throat = 0.007
-            D_outlet = 0.0127
-            A_throat = math.pi * (D_throat/2)**2
-            A_outlet = math.pi * (D_outlet/2)**2
-
-            lever = (theta + 45) / 90
-            P_hot = hotP * 1e5
-            P_cold = coldP * 1e5
-            L_pipe = pipeLen
-            D_pipe = pipeDia / 1000
-
-            A_hot = (1 - lever) * A_throat
-            A_cold = lever * A_throat
-            K_inlet = 0.17
-            K_cart = 0.67
-            K_out = 0.2
-
-            Q_hot = A_hot * math.sqrt((2 * P_hot) / (rho * (K_inlet + K_cart)))
-            Q_cold = A_cold * math.sqrt((2 * P_cold) / (rho * (K_inlet + K_cart)))
-            Q_total = Q_hot + Q_cold
-
-            P_mix = (Q_hot * P_hot + Q_cold * P_cold) / max(Q_total, 1e-6)
-            T_mix = (Q_hot * hotT + Q_cold * coldT) / max(Q_total, 1e-6)
-
-            if outletChoice == 'Shower':
-                K_total = K_cart + K_out
-            else:
-                K_total = K_cart + K_out
-
-            Q_out = A_throat * math.sqrt((2 * P_mix) / (rho * K_total))
-
-            v_out = Q_out / A_outlet
-            DeltaP = 0.5 * rho * v_out**2
-            P_out = P_mix - DeltaP
-
-            A_pipe = math.pi * (D_pipe/2)**2
-            v_pipe = Q_out / A_pipe
-            f = 0.009
-            DeltaP_pipe = f * (L_pipe / D_pipe) * 0.5 * rho * v_pipe**2
-
-            if outletChoice == 'Shower':
-                DeltaP_pipe += rho * g * L_pipe
-            else:
-                DeltaP_pipe *= 0.05
-
-            P_pipe_out = max(P_out - DeltaP_pipe, 0)
-            T_pipe_out = T_mix - 0.2 * L_pipe
-
-            results = {
-                "Valve Outlet Flow (LPM)": Q_out * 1000 * 60,
-                "Valve Outlet Pressure (bar)": P_out / 1e5,
-                "Mixed Water Temperature (°C)": T_mix,
-                "Final Pipe Flow (LPM)": Q_out * 1000 * 60,
-                "Final Pipe Pressure (bar)": P_pipe_out / 1e5,
-                "Final Pipe Temperature (°C)": T_pipe_out
-            }
-            return results
-
         with st.spinner("🔄 Calculating output... Please wait"):
-            results = calculate_valve(hotP, coldP, hotT, coldT, theta, outletChoice, pipeLen, pipeDia)
+            results = models.calculate_valve(hotP, coldP, hotT, coldT, theta, outletChoice, pipeLen, pipeDia, model="AT360")
 
         st.subheader("Results")
         col1, col2, col3 = st.columns(3)
@@ -787,6 +634,26 @@ elif st.session_state.page == 'valve':
             st.metric("Mixed Water Temperature (°C)", f"{results['Mixed Water Temperature (°C)']:.1f}")
             st.metric("Final Pipe Temperature (°C)", f"{results['Final Pipe Temperature (°C)']:.1f}")
 
+        with st.expander("🎯 Lever angle for a target temperature"):
+            target_temp = st.number_input("Target Mixed Water Temp (°C)", value=40.0, step=0.5, key="target_valve")
+            target_theta, target_results = models.valve_angle_for_temp(target_temp, hotP, coldP, hotT, coldT, outletChoice, pipeLen, pipeDia, model="AT360")
+            if np.isnan(target_theta):
+                st.warning(f"⚠️ {target_temp:.1f} °C is outside the {min(hotT, coldT)}–{max(hotT, coldT)} °C these inlets can mix")
+            else:
+                st.success(f"Set the lever to **{target_theta:.1f}°** for {target_temp:.1f} °C at **{target_results['Valve Outlet Flow (LPM)']:.2f} LPM**")
+
+        with st.expander("🧵 Hose heat loss after the pipe"):
+            col_h1, col_h2 = st.columns(2)
+            with col_h1:
+                hoseLen = st.number_input('Hose Length (mm)', value=1500.0, step=100.0, key="hoseLen_valve")
+            with col_h2:
+                T_room = st.number_input('Ambient Temperature (°C)', value=25.0, step=1.0, key="T_room_valve")
+            if results['Final Pipe Flow (LPM)'] > 0:
+                hose = models.hose_heat_loss(results['Final Pipe Temperature (°C)'], T_room, hoseLen / 1000, results['Final Pipe Flow (LPM)'])
+                st.metric("Hose Outlet Temperature (°C)", f"{hose['T_out']:.1f}", f"{-hose['delta_T']:.2f} °C")
+            else:
+                st.info("No flow through the hose")
+
 
 
     elif model_choice == "AT235":
@@ -816,26 +683,8 @@ elif st.session_state.page == 'valve':
             st.markdown("</div>", unsafe_allow_html=True)
 
         with col_gauge:
-            fig = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=theta,
-                title={'text': ""},
-                gauge={
-                    'axis': {'range': [-45, 45]},
-                    'bar': {'color': "darkblue"},
-                    'steps': [
-                        {'range': [-45, 0], 'color': "indianred"},
-                        {'range': [0, 45], 'color': "lightblue"}
-                    ],
-                    'threshold': {
-                        'line': {'color': "red", 'width': 2},
-                        'thickness': 0.75,
-                        'value': theta
-                    }
-                }
-            ))
-            fig.update_layout(height=200, width=200, margin=dict(l=0, r=0, t=0, b=0))
-            st.plotly_chart(fig, use_container_width=False)
+            with rerun.span("gauge"):
+                st.plotly_chart(lever_gauge(theta), use_container_width=False)
 
         with col_image:
             st.markdown("<div style='text-align:center; padding-top: 35px;'>", unsafe_allow_html=True)
@@ -847,70 +696,8 @@ elif st.session_state.page == 'valve':
             st.image("Valve_Shower.png", width=130, caption="Length of Pipe from Valve to Shower")
             st.markdown("</div>", unsafe_allow_html=True)
 
-    # Calculation inside Valve
-        def calculate_valve(hotP, coldP, hotT, coldT, theta, outletChoice, pipeLen, pipeDia):
-            rho = 1000
-            g = 9.81
-            D_throat = 0.0051
-            D_outlet = 0.0127
-            A_throat = math.pi * (D_throat/2)**2
-            A_outlet = math.pi * (D_outlet/2)**2
-
-            lever = (theta + 45) / 90
-            P_hot = hotP * 1e5
-            P_cold = coldP * 1e5
-            L_pipe = pipeLen
-            D_pipe = pipeDia / 1000
-
-            A_hot = (1 - lever) * A_throat
-            A_cold = lever * A_throat
-            K_inlet = 0.17
-            K_cart = 0.65
-            K_out = 0.2
-
-            Q_hot = A_hot * math.sqrt((2 * P_hot) / (rho * (K_inlet + K_cart)))
-            Q_cold = A_cold * math.sqrt((2 * P_cold) / (rho * (K_inlet + K_cart)))
-            Q_total = Q_hot + Q_cold
-
-            P_mix = (Q_hot * P_hot + Q_cold * P_cold) / max(Q_total, 1e-6)
-            T_mix = (Q_hot * hotT + Q_cold * coldT) / max(Q_total, 1e-6)
-
-            if outletChoice == 'Shower':
-                K_total = K_cart + K_out
-            else:
-                K_total = K_cart + K_out
-
-            Q_out = A_throat * math.sqrt((2 * P_mix) / (rho * K_total))
-
-            v_out = Q_out / A_outlet
-            DeltaP = 0.5 * rho * v_out**2
-            P_out = P_mix - DeltaP
-
-            A_pipe = math.pi * (D_pipe/2)**2
-            v_pipe = Q_out / A_pipe
-            f = 0.009
-            DeltaP_pipe = f * (L_pipe / D_pipe) * 0.5 * rho * v_pipe**2
-
-            if outletChoice == 'Shower':
-                DeltaP_pipe += rho * g * L_pipe
-            else:
-                DeltaP_pipe *= 0.05
-
-            P_pipe_out = max(P_out - DeltaP_pipe, 0)
-            T_pipe_out = T_mix - 0.2 * L_pipe
-
-            results = {
-                "Valve Outlet Flow (LPM)": Q_out * 1000 * 60,
-                "Valve Outlet Pressure (bar)": P_out / 1e5,
-                "Mixed Water Temperature (°C)": T_mix,
-                "Final Pipe Flow (LPM)": Q_out * 1000 * 60,
-                "Final Pipe Pressure (bar)": P_pipe_out / 1e5,
-                "Final Pipe Temperature (°C)": T_pipe_out
-            }
-            return results
-
         with st.spinner("🔄 Calculating output... Please wait"):
-            results = calculate_valve(hotP, coldP, hotT, coldT, theta, outletChoice, pipeLen, pipeDia)
+            results = models.calculate_valve(hotP, coldP, hotT, coldT, theta, outletChoice, pipeLen, pipeDia, model="AT235")
 
         st.subheader("Results")
         col1, col2, col3 = st.columns(3)
@@ -925,6 +712,26 @@ elif st.session_state.page == 'valve':
             st.metric("Mixed Water Temperature (°C)", f"{results['Mixed Water Temperature (°C)']:.1f}")
             st.metric("Final Pipe Temperature (°C)", f"{results['Final Pipe Temperature (°C)']:.1f}")
 
+        with st.expander("🎯 Lever angle for a target temperature"):
+            target_temp = st.number_input("Target Mixed Water Temp (°C)", value=40.0, step=0.5, key="target_valve")
+            target_theta, target_results = models.valve_angle_for_temp(target_temp, hotP, coldP, hotT, coldT, outletChoice, pipeLen, pipeDia, model="AT235")
+            if np.isnan(target_theta):
+                st.warning(f"⚠️ {target_temp:.1f} °C is outside the {min(hotT, coldT)}–{max(hotT, coldT)} °C these inlets can mix")
+            else:
+                st.success(f"Set the lever to **{target_theta:.1f}°** for {target_temp:.1f} °C at **{target_results['Valve Outlet Flow (LPM)']:.2f} LPM**")
+
+        with st.expander("🧵 Hose heat loss after the pipe"):
+            col_h1, col_h2 = st.columns(2)
+            with col_h1:
+                hoseLen = st.number_input('Hose Length (mm)', value=1500.0, step=100.0, key="hoseLen_valve")
+            with col_h2:
+                T_room = st.number_input('Ambient Temperature (°C)', value=25.0, step=1.0, key="T_room_valve")
+            if results['Final Pipe Flow (LPM)'] > 0:
+                hose = models.hose_heat_loss(results['Final Pipe Temperature (°C)'], T_room, hoseLen / 1000, results['Final Pipe Flow (LPM)'])
+                st.metric("Hose Outlet Temperature (°C)", f"{hose['T_out']:.1f}", f"{-hose['delta_T']:.2f} °C")
+            else:
+                st.info("No flow through the hose")
+
         # if st.button("🔙 Back to Home"):
         #     st.session_state.page = 'home'
         #     st.rerun()
@@ -967,49 +774,21 @@ elif st.session_state.page == 'valve':
             st.image("5 port.png", width=160, caption="5 Outlet Anthem")
             st.image("6 port.png", width=160, caption="6 Outlet Anthem")
 
-        def get_temp_drop(outlet, len_ft, setting, is_attached):
-            if setting == "A (Mixing)":
-                if outlet == 'Handshower':
-                    deltaT = min(2, 1 * (len_ft / 2))
-                elif outlet == 'Showerhead':
-                    deltaT = np.interp(len_ft, [0, 2, 4, 6], [1, 1.2, 1.9, 3.1])
-                elif outlet == 'Rain Panel':
-                    deltaT = 0.08 * len_ft
-                elif outlet == 'Body Jet -1' or outlet == 'Body Jet -2':
-                    deltaT = 0.5 * len_ft
-                elif outlet == 'Spout':
-                    deltaT = 0.3 * len_ft
-                else:
-                    deltaT = 0.5 * len_ft
-            else:
-                if outlet == 'Handshower':
-                    deltaT = np.interp(len_ft, [0, 2, 4], [0, 2.7, 3.5])
-                elif outlet == 'Showerhead':
-                    deltaT = np.interp(len_ft, [0, 2, 4, 6], [1, 1.2, 1.9, 3.1])
-                elif outlet == 'Rain Panel':
-                    deltaT = np.interp(len_ft, [0, 2], [0, 1.3])
-                elif outlet == 'Body Jet -1' or outlet == 'Body Jet -2':
-                    deltaT = 0.6 * len_ft
-                elif outlet == 'Spout':
-                    deltaT = 0.3 * len_ft
-                else:
-                    deltaT = 0.6 * len_ft
-            return deltaT + 0.8 if is_attached else deltaT
-
         if True:
             mix_ratio_val = mix_ratio
 
-            T_mix = mix_ratio_val * T_hot + (1 - mix_ratio_val) * T_cold
+            outlets = [outlet for outlet, _ in outlet_data]
+            lengths = [length for _, length in outlet_data]
+            T_mix, outlet_temp = models.outlet_temps(T_hot, T_cold, mix_ratio_val, outlets, lengths, mix_setting, product_attached)
             st.success(f"🔁 Valve Output Temperature: **{T_mix:.2f} °C**")
 
             cols = st.columns(num)
-            for i, (outlet, length) in enumerate(outlet_data):
-                delta_T = get_temp_drop(outlet, length, mix_setting, product_attached)
-                outlet_temp = T_mix - delta_T
+            for i, outlet in enumerate(outlets):
                 with cols[i]:
-                    st.metric(label=f"Outlet {i+1} ({outlet})", value=f"{outlet_temp:.1f} °C")
+                    st.metric(label=f"Outlet {i+1} ({outlet})", value=f"{outlet_temp[i]:.1f} °C")
 
     if st.button("🔙 Back to Home", key = "back_home_thermo"):
+        rerun.finish()
         st.session_state.page = 'home'
         st.rerun()
 
@@ -1025,46 +804,12 @@ elif st.session_state.page == 'shower':
     air_temp = st.number_input("Ambient Air Temperature (°C)", value=25.0, step=0.1, format="%.1f")
 
     if st.button("💧 Calculate Final Outlet Temperature"):
-        rho = 997
-        h_fg = 2257000
-        sigma = 5.67e-8
-        emissivity = 0.95
-        Cp_water = 4182
-        rel_humidity = 0.5
-
-        P = pressure * 1e5
-        d_nozzle = nozzle_dia / 1000
-        T_w = temp
-        T_air = air_temp
-
-        v = np.sqrt(2 * P / rho)
-        A_nozzle = np.pi * (d_nozzle / 2)**2
-        Q_single = A_nozzle * v
-        Q_total = Q_single * num_nozzles
-        Q_total_LPM = Q_total * 60000
-
-        if Q_total_LPM > 12:
-            Q_total_LPM = 12
-            Q_total = Q_total_LPM / 60000
-
-        m_dot = rho * Q_total
-        d_droplet = d_nozzle
-        A_surface_total = np.pi * d_droplet**2 * num_nozzles
-
-        h_air = 60
-        q_conv = h_air * A_surface_total * (T_w - T_air)
-        evap_fraction = 0.01 * rel_humidity
-        m_evap = evap_fraction * m_dot
-        q_evap = m_evap * h_fg
-        q_rad = emissivity * sigma * A_surface_total * ((T_w + 273.15)**4 - (T_air + 273.15)**4)
-        q_surface = 0.015 * m_dot * Cp_water * (T_w - T_air)
-
-        deltaT_total = (q_conv + q_evap + q_rad + q_surface) / (m_dot * Cp_water)
-        T_final = T_w - deltaT_total
+        T_final = models.shower_outlet_temp(temp, pressure, nozzle_dia, num_nozzles, air_temp)
 
         st.success(f"🌡️ Final Outlet Temperature: **{T_final:.2f} °C**")
 
     if st.button("🔙 Back to Home", key = "back_home_shower"):
+        rerun.finish()
         st.session_state.page = 'home'
         st.rerun()
 
@@ -1096,27 +841,71 @@ elif st.session_state.page == 'prv':
 
     # After form is submitted
     if submitted:
-        if total_length == 0 or elevation_drop == 0 or target_pressure_bar == 0:
-            st.error("Please fill all fields with non-zero values.")
+        status = prv_status(total_length, elevation_drop, target_pressure_bar)
+        if status != "ok":
+            st.error(STATUS_MESSAGES[status])
         else:
-            rho = 1000  # kg/m³
-            g = 9.81    # m/s²
-            pipe_dia_m = pipe_dia_mm / 1000  # in meters
-            P_target_Pa = target_pressure_bar * 1e5  # in Pascal
-
-            required_height = P_target_Pa / (rho * g)
-            elevation_fraction = required_height / elevation_drop
-            L2 = elevation_fraction * total_length
-            L1 = total_length - L2
+            L1, L2 = models.prv_placement(total_length, elevation_drop, target_pressure_bar)
 
             st.success(f"""✅ To ensure outlet pressure = **{target_pressure_bar:.2f} bar**:
 - Place the PRV **{L1:.2f} meters** from the inlet  
 - (i.e., **{L2:.2f} meters** from the outlet)""")
 
     elif reset:
+        rerun.finish()
         st.experimental_rerun()
 
+    # Batch mode: a whole pipeline inventory, streamed chunk by chunk
+    st.markdown("### 📂 Batch Placement")
+    st.caption("CSV with one pipeline per row and columns total_length (m), elevation_drop (m) and target_pressure_bar (bar).")
+    inventory = st.file_uploader("Pipeline inventory", type=["csv"], key="prv_inventory")
+    if inventory is not None:
+        # Score each uploaded file once; widget reruns reuse the result
+        if st.session_state.get("prv_batch", {}).get("file_id") != inventory.file_id:
+            import io
+            from kohler_model.batch import read_chunks, score_chunks, write_chunks
+
+            status_counts = {}
+
+            def counted(chunks):
+                for chunk in chunks:
+                    names, counts = np.unique(chunk["status"], return_counts=True)
+                    for name, count in zip(names.tolist(), counts.tolist()):
+                        status_counts[name] = status_counts.get(name, 0) + count
+                    yield chunk
+
+            placed = io.StringIO()
+            batch = {"file_id": inventory.file_id}
+            try:
+                text = io.StringIO(inventory.getvalue().decode("utf-8"), newline="")
+                write_chunks(counted(score_chunks("prv", read_chunks(text, "csv"))), placed, "csv")
+            except ValueError as exc:  # includes a file that is not UTF-8
+                batch["error"] = str(exc)
+            else:
+                batch.update(counts=status_counts, csv=placed.getvalue())
+            st.session_state.prv_batch = batch
+
+        batch = st.session_state.prv_batch
+        if "error" in batch:
+            st.error(f"Could not process the inventory: {batch['error']}")
+        else:
+            st.table({"Status": list(batch["counts"]), "Pipelines": list(batch["counts"].values())})
+            st.download_button("⬇️ Download PRV placements", batch["csv"], file_name="prv_placements.csv", mime="text/csv")
+
     st.markdown("---")
     if st.button("🔙 Back to Home", key="back_home_prv"):
+        rerun.finish()
         st.session_state.page = 'home'
         st.rerun()
+
+rerun.finish()
+
+# --- Debug: model cache effectiveness and rerun timings (append ?debug=1 to the URL) ---
+if st.query_params.get("debug") == "1":
+    with st.expander("🧮 Model cache"):
+        st.table(st.session_state.models.stats())
+    with st.expander("⏱️ Rerun timings"):
+        st.markdown("**This rerun (ms)**")
+        st.table([st.session_state.timings[-1]["spans_ms"]])
+        st.markdown(f"**Last {len(st.session_state.timings)} reruns of this session**")
+        st.table(summary(st.session_state.timings))
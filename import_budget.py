@@ -0,0 +1,54 @@
+"""Cold-start import budget for the Streamlit app.
+
+Each phase is timed in a fresh interpreter: what every run of home.py
+imports up front, matplotlib, then what each page adds the first time it
+renders.
+Prints the best of a few runs per phase and exits non-zero when any phase
+is over its budget.
+
+    python import_budget.py
+"""
+import subprocess
+import sys
+
+STARTUP = "import streamlit, numpy, base64, kohler_model"
+MATPLOTLIB = "import matplotlib.figure"
+
+# phase -> (already imported, timed, measured ms). Streamlit itself imports
+# plotly, so the valve page only adds the gauge module and its first figure;
+# matplotlib is the one plotting library a cold start does not load.
+PHASES = {
+    "startup": ("", STARTUP, 630),
+    "matplotlib": (STARTUP, MATPLOTLIB, 400),
+    "faucet page": (f"{STARTUP}\n{MATPLOTLIB}", "import charts", 5),
+    "valve page": (STARTUP, "from gauges import lever_gauge; lever_gauge(0)", 25),
+}
+# Budget: the measured time plus 30 %, and at least 10 ms, for machine noise
+MARGIN = 0.3
+MARGIN_MS = 10
+RUNS = 3
+
+
+def time_phase(setup, timed):
+    code = (f"{setup}\nimport time\nt = time.perf_counter()\n{timed}\n"
+            "print((time.perf_counter() - t) * 1000)")
+    best = float("inf")
+    for _ in range(RUNS):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        best = min(best, float(out.stdout.strip().splitlines()[-1]))
+    return best
+
+
+def main():
+    over = False
+    for phase, (setup, timed, measured) in PHASES.items():
+        budget = round(measured + max(measured * MARGIN, MARGIN_MS))
+        ms = time_phase(setup, timed)
+        status = "ok" if ms <= budget else "OVER BUDGET"
+        over |= ms > budget
+        print(f"{phase:<12} {ms:7.0f} ms / {budget} ms  {status}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
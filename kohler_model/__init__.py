@@ -0,0 +1,52 @@
+"""Array-native engines behind the Kohler performance model pages.
+
+Importing the package never pulls in Streamlit or a plotting library; run
+``python -m kohler_model --list`` for the command-line interface.
+"""
+from .api import MODELS, evaluate
+from .cache import Memo, session_models
+from .faucet import CARTRIDGES, cartridge_area, faucet_mix, flow_curve
+from .hose import hose_heat_loss, hose_outlet_temp
+from .network import solve_network, valve_network
+from .prv import prv_placement, prv_plan, prv_status
+from .shower import shower_flow, shower_outlet_temp, shower_sweep
+from .solve import faucet_angle_for_temp, valve_angle_for_temp
+from .thermostatic import DROP_TABLE, OUTLET_TYPES, get_temp_drop, outlet_temps
+from .tolerance import monte_carlo
+from .transient import pipe_transient, valve_transient
+from .valve import VALVES, calculate_valve, valve_params
+from .water import water_properties
+
+__all__ = [
+    "CARTRIDGES",
+    "DROP_TABLE",
+    "MODELS",
+    "Memo",
+    "OUTLET_TYPES",
+    "VALVES",
+    "calculate_valve",
+    "cartridge_area",
+    "evaluate",
+    "faucet_angle_for_temp",
+    "faucet_mix",
+    "flow_curve",
+    "get_temp_drop",
+    "hose_heat_loss",
+    "hose_outlet_temp",
+    "monte_carlo",
+    "outlet_temps",
+    "pipe_transient",
+    "prv_placement",
+    "prv_plan",
+    "prv_status",
+    "session_models",
+    "shower_flow",
+    "shower_outlet_temp",
+    "shower_sweep",
+    "solve_network",
+    "valve_angle_for_temp",
+    "valve_network",
+    "valve_params",
+    "valve_transient",
+    "water_properties",
+]
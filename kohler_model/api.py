@@ -0,0 +1,130 @@
+"""Headless entry point to every model.
+
+MODELS describes each model's input columns (with the UI defaults), its
+output columns and how to run it on a dict of column arrays. evaluate()
+is the one call the CLI, batch runner and any script should go through;
+nothing here imports Streamlit or a plotting library.
+"""
+import numpy as np
+
+from .faucet import faucet_mix
+from .hose import hose_heat_loss
+from .prv import prv_plan
+from .shower import shower_outlet_temp
+from .thermostatic import MIXING, get_temp_drop
+from .valve import calculate_valve
+
+_VALVE_OUTPUTS = [
+    "Valve Outlet Flow (LPM)",
+    "Valve Outlet Pressure (bar)",
+    "Mixed Water Temperature (°C)",
+    "Final Pipe Flow (LPM)",
+    "Final Pipe Pressure (bar)",
+    "Final Pipe Temperature (°C)",
+]
+
+
+def _run_faucet(c):
+    T_mixed, flow_LPM = faucet_mix(c["hot_temp"], c["cold_temp"], c["hot_pressure"],
+                                   c["cold_pressure"], c["lever_angle"], c["cartridge"])
+    return {"T_mixed": T_mixed, "flow_LPM": flow_LPM}
+
+
+def _run_valve(c):
+    return calculate_valve(c["hotP"], c["coldP"], c["hotT"], c["coldT"], c["theta"],
+                           c["outletChoice"], c["pipeLen"], c["pipeDia"], model=c["model"])
+
+
+def _run_shower(c):
+    return {"T_final": shower_outlet_temp(c["temp"], c["pressure"], c["nozzle_dia"],
+                                          c["num_nozzles"], c["air_temp"])}
+
+
+def _run_thermostatic(c):
+    T_mix = c["mix_ratio"] * c["T_hot"] + (1 - c["mix_ratio"]) * c["T_cold"]
+    delta_T = get_temp_drop(c["outlet"], c["len_ft"], c["setting"], c["is_attached"])
+    return {"T_mix": T_mix, "delta_T": delta_T, "outlet_temp": T_mix - delta_T}
+
+
+def _run_hose(c):
+    hose = hose_heat_loss(c["T_in"], c["T_room"], c["length"], c["flow_LPM"])
+    return {key: hose[key] for key in ("Re", "Q_total", "delta_T", "T_out")}
+
+
+def _run_prv(c):
+    return prv_plan(c["total_length"], c["elevation_drop"], c["target_pressure_bar"])
+
+
+# name -> input columns with defaults, output columns and runner
+MODELS = {
+    "faucet": {
+        "inputs": {"hot_temp": 60.0, "cold_temp": 20.0, "hot_pressure": 1.5,
+                   "cold_pressure": 2.95, "lever_angle": 0.0, "cartridge": "26mm"},
+        "outputs": ["T_mixed", "flow_LPM"],
+        "run": _run_faucet,
+    },
+    "valve": {
+        "inputs": {"hotP": 3.0, "coldP": 3.0, "hotT": 60.0, "coldT": 25.0, "theta": 0.0,
+                   "outletChoice": "Spout", "pipeLen": 1.0, "pipeDia": 18.4, "model": "AT360"},
+        "outputs": _VALVE_OUTPUTS,
+        "run": _run_valve,
+    },
+    "shower": {
+        "inputs": {"temp": 40.0, "pressure": 3.0, "nozzle_dia": 1.2, "num_nozzles": 50,
+                   "air_temp": 25.0},
+        "outputs": ["T_final"],
+        "run": _run_shower,
+    },
+    "thermostatic": {
+        "inputs": {"T_hot": 60.9, "T_cold": 20.8, "mix_ratio": 0.5, "outlet": "Spout",
+                   "len_ft": 2.0, "setting": MIXING, "is_attached": True},
+        "outputs": ["T_mix", "delta_T", "outlet_temp"],
+        "run": _run_thermostatic,
+    },
+    "hose": {
+        "inputs": {"T_in": 50.0, "T_room": 25.0, "length": 1.5, "flow_LPM": 8.0},
+        "outputs": ["Re", "Q_total", "delta_T", "T_out"],
+        "run": _run_hose,
+    },
+    "prv": {
+        "inputs": {"total_length": 0.0, "elevation_drop": 0.0, "target_pressure_bar": 0.0},
+        "outputs": ["L1", "L2", "status"],
+        "run": _run_prv,
+    },
+}
+
+_TRUE = {"1", "true", "yes", "y", "on"}
+
+
+def _coerce(values, default):
+    if isinstance(default, bool):
+        arr = np.asarray(values)
+        if arr.dtype.kind in "biuf":
+            return arr.astype(bool)[()]
+        return np.isin(np.char.lower(np.char.strip(arr.astype(str))), list(_TRUE))[()]
+    if isinstance(default, str):
+        return values if isinstance(values, str) else np.asarray(values).astype(str)
+    return np.asarray(values, dtype=float)
+
+
+def model_spec(name):
+    if name not in MODELS:
+        raise ValueError(f"Unknown model {name!r}; expected one of {list(MODELS)}")
+    return MODELS[name]
+
+
+def evaluate(name, columns):
+    """Run model `name` on a mapping of input column -> scalar or array.
+
+    Missing inputs take the UI defaults, numeric columns are parsed as
+    floats and flags accept true/false, yes/no or 1/0. Returns a dict of
+    output column -> array (or scalar when every input was a scalar).
+    """
+    spec = model_spec(name)
+    unknown = set(columns) - set(spec["inputs"])
+    if unknown:
+        raise ValueError(f"Unknown {name} input(s) {sorted(unknown)}; "
+                         f"expected {list(spec['inputs'])}")
+    c = {key: _coerce(columns.get(key, default), default)
+         for key, default in spec["inputs"].items()}
+    return spec["run"](c)
@@ -0,0 +1,289 @@
+"""Streaming batch evaluation of operating-point files and test-bench logs.
+
+The pipeline is three generators over column chunks (dict of column name
+-> list or array), so memory stays bounded by the chunk size however long
+the log is:
+
+    read_chunks -> score_chunks -> write_chunks
+
+score_chunks maps log columns onto model inputs, appends the predicted
+outputs and, for outputs with a measured column in the log, a residual
+column (predicted - measured) plus running error statistics.
+
+Paths may also be open text streams (e.g. an uploaded file), which are
+read or written but left open. Parquet support needs the optional
+``pyarrow`` package.
+"""
+import csv
+import itertools
+import json
+import sys
+
+import numpy as np
+
+from .api import evaluate, model_spec
+
+FORMATS = ["csv", "json", "jsonl", "parquet"]
+_SUFFIXES = {".csv": "csv", ".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl",
+             ".parquet": "parquet", ".pq": "parquet"}
+
+
+def format_for(path, explicit=None):
+    """Explicit format, else the one implied by the file suffix, else csv."""
+    if explicit:
+        return explicit
+    if not isinstance(path, str):
+        return "csv"
+    for suffix, fmt in _SUFFIXES.items():
+        if path.lower().endswith(suffix):
+            return fmt
+    return "csv"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("Parquet files need pyarrow: pip install pyarrow") from exc
+    return pyarrow
+
+
+def _open(path, mode):
+    if not isinstance(path, str):
+        return path
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+def _owned(stream, path):
+    # True for streams opened here, which are closed after use
+    return isinstance(path, str) and stream not in (sys.stdin, sys.stdout)
+
+
+def chunked(iterable, size):
+    iterable = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterable, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _records_to_columns(records):
+    keys = dict.fromkeys(key for record in records for key in record)
+    return {key: [record.get(key, "") for record in records] for key in keys}
+
+
+def _json_records(stream, block=1 << 16):
+    # Objects of a top-level JSON array (or one object), decoded as the text
+    # arrives so a large array is never held whole
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    started = False
+    eof = False
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                break
+            buffer, pos = stream.read(block), 0
+            eof = not buffer
+            continue
+        if not started:
+            started = True
+            if buffer[pos] == "[":
+                pos += 1
+                continue
+        elif buffer[pos] == "]":
+            break
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            more = stream.read(block)
+            if not more:
+                raise
+            buffer, pos = buffer[pos:] + more, 0
+            continue
+        yield record
+        pos = end
+
+
+def read_chunks(path, fmt=None, chunk_size=10000):
+    """Yield column chunks of at most chunk_size rows from a file ('-' = stdin)."""
+    fmt = format_for(path, fmt)
+    if fmt == "parquet":
+        if path == "-":
+            raise ValueError("Parquet input must be a file, not stdin")
+        parquet_file = _pyarrow().parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield {name: batch.column(i).to_numpy(zero_copy_only=False)
+                   for i, name in enumerate(batch.schema.names)}
+        return
+
+    stream = _open(path, "r")
+    try:
+        if fmt == "csv":
+            reader = csv.reader(stream)
+            header = next(reader, None)
+            if header is None:
+                return
+            width = len(header)
+            for rows in chunked(reader, chunk_size):
+                rows = [row if len(row) == width else (row + [""] * width)[:width] for row in rows]
+                yield dict(zip(header, map(list, zip(*rows))))
+        elif fmt == "jsonl":
+            lines = (json.loads(line) for line in stream if line.strip())
+            for records in chunked(lines, chunk_size):
+                yield _records_to_columns(records)
+        else:
+            for records in chunked(_json_records(stream), chunk_size):
+                yield _records_to_columns(records)
+    finally:
+        if _owned(stream, path):
+            stream.close()
+
+
+def _fill_blanks(values, default):
+    # Blank cells (empty CSV fields, JSON/Parquet nulls, NaN) take the model default
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biufU":
+        if values.dtype.kind == "f" and not isinstance(default, str):
+            return np.where(np.isnan(values), default, values)
+        return values
+    if any(v is None or v == "" for v in values):
+        return [default if v is None or v == "" else v for v in values]
+    return values
+
+
+def _as_float(values):
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+        return values.astype(float)
+    return np.array([np.nan if v is None or v == "" else v for v in values], dtype=float)
+
+
+class ResidualStats:
+    """Running bias / RMSE / max-abs of predicted - measured, ignoring NaNs."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.max_abs = 0.0
+
+    def update(self, residual):
+        residual = residual[~np.isnan(residual)]
+        if residual.size:
+            self.count += residual.size
+            self.total += float(residual.sum())
+            self.total_sq += float(np.dot(residual, residual))
+            self.max_abs = max(self.max_abs, float(np.abs(residual).max()))
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0, "bias": np.nan, "rmse": np.nan, "max_abs": np.nan}
+        return {
+            "count": self.count,
+            "bias": self.total / self.count,
+            "rmse": (self.total_sq / self.count) ** 0.5,
+            "max_abs": self.max_abs,
+        }
+
+
+def score_chunks(name, chunks, columns=None, measured=None, stats=None):
+    """Evaluate model `name` on each chunk and yield it with outputs appended.
+
+    columns maps model inputs to log column names where they differ, and
+    measured maps model outputs to the log columns that measured them;
+    each measured output gets a '<output>_residual' column. Pass a dict as
+    stats to collect a ResidualStats per measured output.
+    """
+    spec = model_spec(name)
+    columns = columns or {}
+    measured = measured or {}
+    unknown = (set(columns) - set(spec["inputs"])) | (set(measured) - set(spec["outputs"]))
+    if unknown:
+        raise ValueError(f"{name} has no input/output named {sorted(unknown)}")
+    if stats is not None:
+        for key in measured:
+            stats.setdefault(key, ResidualStats())
+
+    for chunk in chunks:
+        n = len(next(iter(chunk.values())))
+        inputs = {key: _fill_blanks(chunk[columns.get(key, key)], default)
+                  for key, default in spec["inputs"].items()
+                  if columns.get(key, key) in chunk}
+        results = evaluate(name, inputs)
+
+        out = dict(chunk)
+        for key in spec["outputs"]:
+            predicted = np.broadcast_to(results[key], (n,))
+            out[key] = predicted
+            if key in measured:
+                if measured[key] not in chunk:
+                    raise ValueError(f"Measured column {measured[key]!r} not in the log")
+                residual = predicted - _as_float(chunk[measured[key]])
+                out[f"{key}_residual"] = residual
+                if stats is not None:
+                    stats[key].update(residual)
+        yield out
+
+
+def _as_list(values):
+    return values.tolist() if isinstance(values, np.ndarray) else list(values)
+
+
+def _json_row(keys, row):
+    # NaN and infinities (e.g. PRV lengths of missing_input rows) become null
+    return json.dumps({key: None if isinstance(value, float) and not np.isfinite(value) else value
+                       for key, value in zip(keys, row)}, allow_nan=False)
+
+
+def write_chunks(chunks, path, fmt=None):
+    """Write column chunks to a file ('-' = stdout) as they arrive."""
+    fmt = format_for(path, fmt)
+    if fmt == "parquet":
+        if path == "-":
+            raise ValueError("Parquet output must be a file, not stdout")
+        pa = _pyarrow()
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.table({key: values if isinstance(values, np.ndarray) else list(values)
+                                  for key, values in chunk.items()})
+                if writer is None:
+                    writer = pa.parquet.ParquetWriter(path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+
+    stream = _open(path, "w")
+    try:
+        first = True
+        header = None
+        for chunk in chunks:
+            if fmt == "csv":
+                if header is None:
+                    header = list(chunk)
+                    writer = csv.writer(stream)
+                    writer.writerow(header)
+                n = len(next(iter(chunk.values())))
+                writer.writerows(zip(*(_as_list(chunk.get(key, [""] * n)) for key in header)))
+                continue
+            keys = list(chunk)
+            rows = zip(*(_as_list(values) for values in chunk.values()))
+            if fmt == "jsonl":
+                stream.writelines(_json_row(keys, row) + "\n" for row in rows)
+            else:
+                for row in rows:
+                    stream.write(("[\n" if first else ",\n") + _json_row(keys, row))
+                    first = False
+        if fmt == "json":
+            stream.write("[]\n" if first else "\n]\n")
+    finally:
+        if _owned(stream, path):
+            stream.close()
@@ -0,0 +1,121 @@
+"""Bounded LRU memoization for the model functions.
+
+Each Memo keys calls on the normalized argument tuple (numbers rounded so
+that slider values like 0.1 + 0.2 and 0.3 share an entry) and keeps hit,
+miss and bypass counters. Calls with array arguments are not cached.
+Cached arrays are handed out read-only and dicts as fresh copies, so a
+caller changing a result cannot change what later hits return.
+"""
+from collections import OrderedDict
+import functools
+from types import SimpleNamespace
+
+import numpy as np
+
+from .faucet import faucet_mix, flow_curve
+from .hose import hose_heat_loss
+from .prv import prv_placement
+from .shower import shower_outlet_temp
+from .solve import faucet_angle_for_temp, valve_angle_for_temp
+from .thermostatic import get_temp_drop, outlet_temps
+from .valve import calculate_valve
+
+MODEL_FUNCTIONS = {
+    "faucet_mix": faucet_mix,
+    "flow_curve": flow_curve,
+    "calculate_valve": calculate_valve,
+    "shower_outlet_temp": shower_outlet_temp,
+    "get_temp_drop": get_temp_drop,
+    "outlet_temps": outlet_temps,
+    "prv_placement": prv_placement,
+    "hose_heat_loss": hose_heat_loss,
+    "faucet_angle_for_temp": faucet_angle_for_temp,
+    "valve_angle_for_temp": valve_angle_for_temp,
+}
+
+
+def _normalize(value, ndigits):
+    if value is None or isinstance(value, (bool, np.bool_, str)):
+        return value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return round(float(value), ndigits)
+    if isinstance(value, (tuple, list)):
+        return tuple(_normalize(v, ndigits) for v in value)
+    raise TypeError(f"cannot memoize argument of type {type(value).__name__}")
+
+
+def _frozen(value):
+    # Read-only views of arrays; containers rebuilt around them
+    if isinstance(value, np.ndarray):
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    if isinstance(value, dict):
+        return {k: _frozen(v) for k, v in value.items()}
+    if isinstance(value, (tuple, list)):
+        return type(value)(_frozen(v) for v in value)
+    return value
+
+
+class Memo:
+    """LRU-memoized wrapper around a pure model function."""
+
+    def __init__(self, func, maxsize=256, ndigits=9):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.maxsize = maxsize
+        self.ndigits = ndigits
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._store = OrderedDict()
+
+    def __call__(self, *args, **kwargs):
+        try:
+            key = (_normalize(args, self.ndigits),
+                   tuple(sorted((k, _normalize(v, self.ndigits)) for k, v in kwargs.items())))
+        except TypeError:
+            self.bypassed += 1
+            return self.func(*args, **kwargs)
+
+        if key in self._store:
+            self._store.move_to_end(key)
+            self.hits += 1
+            return _frozen(self._store[key])
+
+        self.misses += 1
+        result = _frozen(self.func(*args, **kwargs))
+        self._store[key] = result
+        if len(self._store) > self.maxsize:
+            self._store.popitem(last=False)
+        return _frozen(result)
+
+    def stats(self):
+        calls = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "size": len(self._store),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / calls if calls else 0.0,
+        }
+
+    def clear(self):
+        self._store.clear()
+        self.hits = self.misses = self.bypassed = 0
+
+
+def session_models(maxsize=256):
+    """Fresh set of memoized model functions, one Memo per model.
+
+    Intended to live in a Streamlit session (st.session_state) so each user
+    gets their own bounded cache. ``stats()`` on the result reports the
+    counters of every model.
+    """
+    memos = {name: Memo(func, maxsize) for name, func in MODEL_FUNCTIONS.items()}
+    return SimpleNamespace(
+        **memos,
+        stats=lambda: {name: memo.stats() for name, memo in memos.items()},
+        clear=lambda: [memo.clear() for memo in memos.values()],
+    )
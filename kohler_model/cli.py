@@ -0,0 +1,84 @@
+"""Command-line front end: python -m kohler_model <model> [options].
+
+Operating points (or test-bench logs) are read as CSV, JSON, JSON lines or
+Parquet from a file or stdin, evaluated in vectorized chunks and streamed
+back out with the model outputs appended to each row.
+"""
+import argparse
+import sys
+
+from .api import MODELS
+from .batch import FORMATS, format_for, read_chunks, score_chunks, write_chunks
+
+
+def _list_models():
+    for name, spec in MODELS.items():
+        inputs = ", ".join(f"{key}={default!r}" for key, default in spec["inputs"].items())
+        print(f"{name}\n  inputs:  {inputs}\n  outputs: {', '.join(spec['outputs'])}")
+
+
+def _pairs(option, items):
+    pairs = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep or not key or not value:
+            raise ValueError(f"{option} expects NAME=COLUMN, got {item!r}")
+        pairs[key] = value
+    return pairs
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m kohler_model",
+        description="Evaluate Kohler performance models on batches of operating points.")
+    parser.add_argument("model", nargs="?", choices=list(MODELS),
+                        help="model to run (use --list to see inputs and outputs)")
+    parser.add_argument("-i", "--input", default="-", help="input file, '-' for stdin (default)")
+    parser.add_argument("-o", "--output", default="-", help="output file, '-' for stdout (default)")
+    parser.add_argument("--from", dest="in_format", choices=FORMATS,
+                        help="input format (default: from the file suffix, else csv)")
+    parser.add_argument("--to", dest="out_format", choices=FORMATS,
+                        help="output format (default: from the file suffix, else the input format)")
+    parser.add_argument("--chunk-size", type=int, default=10000,
+                        help="rows evaluated per vectorized call")
+    parser.add_argument("--map", dest="columns", action="append", default=[], metavar="INPUT=COLUMN",
+                        help="read model input INPUT from log column COLUMN (repeatable)")
+    parser.add_argument("--measured", action="append", default=[], metavar="OUTPUT=COLUMN",
+                        help="compare model output OUTPUT with log column COLUMN and "
+                             "write an OUTPUT_residual column (repeatable)")
+    parser.add_argument("--list", action="store_true", help="list the models and exit")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.list:
+        _list_models()
+        return 0
+    if args.model is None:
+        parser.error("a model is required (or --list)")
+
+    in_format = format_for(args.input, args.in_format)
+    if args.out_format:
+        out_format = args.out_format
+    elif args.output != "-":
+        out_format = format_for(args.output)
+    else:
+        out_format = in_format
+
+    stats = {}
+    try:
+        chunks = read_chunks(args.input, in_format, args.chunk_size)
+        scored = score_chunks(args.model, chunks, _pairs("--map", args.columns),
+                              _pairs("--measured", args.measured), stats)
+        write_chunks(scored, args.output, out_format)
+    except (ValueError, KeyError, ImportError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+    for key, residuals in stats.items():
+        summary = residuals.summary()
+        print(f"{key}: n={summary['count']} bias={summary['bias']:.4g} "
+              f"rmse={summary['rmse']:.4g} max|err|={summary['max_abs']:.4g}", file=sys.stderr)
+    return 0
@@ -0,0 +1,128 @@
+"""Lever faucet mixing model.
+
+Lever angle -> hot/cold port areas -> orifice mass flows -> outlet
+temperature and flow. Every argument may be a scalar or a NumPy array;
+arguments broadcast against each other so a full sweep is a single call.
+"""
+import numpy as np
+
+from .water import water_property
+
+# Cartridge size -> maximum port area A_max (m²)
+CARTRIDGES = {
+    "26mm": 7e-3,
+    "28mm": 8.5e-3,
+    "35mm": 15.75e-3,
+}
+
+RHO = 980      # kg/m³, fixed density for callers that pass rho=RHO
+C_D = 1.0      # discharge coefficient
+DP_MIN = 1e4   # Pa, floor on the inlet pressure drop
+
+_SIZES = np.array([26, 28, 35])
+_A_MAX = np.array([CARTRIDGES[f"{size}mm"] for size in _SIZES])
+
+
+def _parse_size(name):
+    text = str(name).strip().lower()
+    if text.endswith("mm"):
+        text = text[:-2]
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def cartridge_area(cartridge):
+    """A_max (m²) for a cartridge id or an array of ids.
+
+    Ids may be names ("26mm"), bare sizes ("26") or numbers (26).
+    """
+    if isinstance(cartridge, str) and cartridge in CARTRIDGES:
+        return CARTRIDGES[cartridge]
+
+    ids = np.asarray(cartridge)
+    if ids.dtype.kind in "USO":
+        names, inverse = np.unique(ids, return_inverse=True)
+        ids = np.array([_parse_size(n) for n in names])[inverse].reshape(ids.shape)
+
+    idx = np.clip(np.searchsorted(_SIZES, ids), 0, len(_SIZES) - 1)
+    unknown = _SIZES[idx] != ids
+    if np.any(unknown):
+        bad = sorted(set(np.asarray(cartridge)[unknown].ravel().tolist()), key=str)
+        raise ValueError(f"Unknown cartridge {bad}; expected one of {list(CARTRIDGES)}")
+    return _A_MAX[idx]
+
+
+def _densities(rho, hot_temp, cold_temp):
+    # Per-inlet density: the given constant, else the water table at each inlet temperature
+    if rho is not None:
+        return rho, rho
+    if hot_temp is None or cold_temp is None:
+        raise ValueError("Inlet temperatures are needed for the water density (or pass rho)")
+    return water_property("rho", hot_temp), water_property("rho", cold_temp)
+
+
+def _mass_flux(pressure, rho, C_d):
+    # kg/(s·m²) through a fully open port at the given inlet pressure (bar)
+    deltaP = np.maximum(np.asarray(pressure, dtype=float) * 1e5, DP_MIN)
+    return C_d * np.sqrt(2 * rho * deltaP)
+
+
+def faucet_mix(hot_temp, cold_temp, hot_pressure, cold_pressure, lever_angle,
+               cartridge="26mm", rho=None, C_d=C_D, A_max=None):
+    """Outlet temperature (°C) and flow (LPM) of the lever faucet.
+
+    Pressures in bar, temperatures in °C, lever_angle in degrees
+    (-45 = full hot, +45 = full cold). Each inlet's density comes from the
+    water table at its temperature unless a fixed rho is given. A_max (m²)
+    overrides the cartridge's nominal port area, e.g. per sampled unit.
+    Returns (T_mixed, flow_LPM).
+    """
+    A_max = cartridge_area(cartridge) if A_max is None else np.asarray(A_max, dtype=float)
+    hot_temp = np.asarray(hot_temp, dtype=float)
+    cold_temp = np.asarray(cold_temp, dtype=float)
+    lever = (45 - np.asarray(lever_angle, dtype=float)) / 90
+    rho_hot, rho_cold = _densities(rho, hot_temp, cold_temp)
+
+    m_dot_hot = lever * A_max * _mass_flux(hot_pressure, rho_hot, C_d)
+    m_dot_cold = (1 - lever) * A_max * _mass_flux(cold_pressure, rho_cold, C_d)
+    m_dot_total = m_dot_hot + m_dot_cold
+
+    # written as "stagnant" so that NaN inputs stay NaN rather than reading as no flow
+    stagnant = m_dot_total < 1e-6
+    denom = np.where(stagnant, 1.0, m_dot_total)
+    T_mixed = np.where(stagnant,
+                       (hot_temp + cold_temp) / 2,
+                       (m_dot_hot * hot_temp + m_dot_cold * cold_temp) / denom)
+    flow_LPM = np.where(stagnant, 0.0, (m_dot_hot / rho_hot + m_dot_cold / rho_cold) * 60)
+    return T_mixed[()], flow_LPM[()]
+
+
+def flow_curve(hot_pressure, cold_pressure, cartridge="26mm", angles=50,
+               rho=None, C_d=C_D, hot_temp=None, cold_temp=None):
+    """Flow (LPM) against lever angle for one or many pressure pairs.
+
+    angles is either a point count spread over -45..45° or an explicit
+    1-D array of angles. The pressures, cartridge and inlet temperatures
+    (needed for the densities unless a fixed rho is given) broadcast
+    against each other; flows has their broadcast shape plus a trailing
+    angle axis. Returns (angles, flows).
+    """
+    if np.ndim(angles) == 0:
+        angles = np.linspace(-45, 45, int(angles))
+    angles = np.asarray(angles, dtype=float)
+    lever = (45 - angles) / 90
+
+    rho_hot, rho_cold = (np.asarray(r, dtype=float)[..., None]
+                         for r in _densities(rho, hot_temp, cold_temp))
+
+    A_max = np.asarray(cartridge_area(cartridge))[..., None]
+    G_hot = _mass_flux(np.asarray(hot_pressure, dtype=float)[..., None], rho_hot, C_d)
+    G_cold = _mass_flux(np.asarray(cold_pressure, dtype=float)[..., None], rho_cold, C_d)
+
+    m_dot_hot = A_max * lever * G_hot
+    m_dot_cold = A_max * (1 - lever) * G_cold
+    flows = np.where(m_dot_hot + m_dot_cold < 1e-6,
+                     0.0, (m_dot_hot / rho_hot + m_dot_cold / rho_cold) * 60)
+    return angles, flows
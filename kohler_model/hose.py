@@ -0,0 +1,79 @@
+"""Hose heat-loss model, ported from try1.m.
+
+Water flows through an EPDM tube with a vinyl jacket. The inner film
+coefficient is laminar (Nu = 3.66) below Re = 4000 and Dittus–Boelter
+above it; the film, EPDM, vinyl and outer air resistances in series give
+the heat loss per metre and hence the outlet temperature. Every argument
+may be a scalar or an array.
+"""
+import numpy as np
+
+from .water import water_properties
+
+# Hose cross-section (m)
+R_INNER = 4.5 / 2000   # r1, inner radius
+R_EPDM = 9.5 / 2000    # r2, outer radius of the EPDM tube
+R_OUTER = 11 / 2000    # r3, outer radius of the vinyl jacket
+
+K_EPDM = 0.25     # W/m·K
+K_VINYL = 0.2     # W/m·K
+H_OUT = 500       # W/m²K, outer film coefficient
+RE_TURBULENT = 4000
+NU_LAMINAR = 3.66
+LPM_TO_M3S = 0.0000167  # as in try1.m
+DT_OFFSET = 0.2537      # °C, fixed drop added in try1.m
+
+# Conduction through the EPDM tube and vinyl jacket plus the outer film, per 2π per metre
+_R_WALL = (np.log(R_EPDM / R_INNER) / K_EPDM + np.log(R_OUTER / R_EPDM) / K_VINYL
+           + 1 / (H_OUT * R_OUTER))
+
+
+def film_coefficient(Re, Pr, k, diameter):
+    """Inner film coefficient (W/m²K) of try1.m: laminar Nu = 3.66 below
+    Re = 4000, Dittus–Boelter above it; diameter in m."""
+    Re = np.asarray(Re, dtype=float)
+    return np.where(Re < RE_TURBULENT,
+                    NU_LAMINAR * k / diameter,
+                    0.023 * Re**0.8 * Pr**0.4 * k / diameter)
+
+
+def hose_heat_loss(T_in, T_room, length, flow_LPM):
+    """Heat loss along a hose of `length` m carrying flow_LPM at T_in (°C)
+    into air at T_room (°C). Returns a dict with the velocity (m/s), Re, Pr,
+    h_in (W/m²K), Q_unit_length (W/m), Q_total (W), delta_T and T_out (°C)."""
+    T_in = np.asarray(T_in, dtype=float)
+    T_room = np.asarray(T_room, dtype=float)
+    L = np.asarray(length, dtype=float)
+    vol_flow_rate = np.asarray(flow_LPM, dtype=float) * LPM_TO_M3S
+
+    props = water_properties(T_in)
+    rho, neta, k, c_p = props["rho"], props["mu"], props["k"], props["cp"]
+
+    mfr = rho * vol_flow_rate
+    area = np.pi * R_INNER**2
+    V = vol_flow_rate / area
+
+    Re = (rho * V * 2 * R_INNER) / neta
+    Pr = (c_p * neta) / k
+
+    h_in = film_coefficient(Re, Pr, k, 2 * R_INNER)
+
+    Q_unit_length = 2 * np.pi * (T_in - T_room) / (1 / (h_in * R_INNER) + _R_WALL)
+    Q_total = Q_unit_length * L
+
+    delta_T = Q_total / (mfr * c_p) + DT_OFFSET
+    return {
+        "velocity": V[()],
+        "Re": Re[()],
+        "Pr": Pr[()],
+        "h_in": h_in[()],
+        "Q_unit_length": Q_unit_length[()],
+        "Q_total": Q_total[()],
+        "delta_T": delta_T[()],
+        "T_out": (T_in - delta_T)[()],
+    }
+
+
+def hose_outlet_temp(T_in, T_room, length, flow_LPM):
+    """Water temperature (°C) at the end of the hose."""
+    return hose_heat_loss(T_in, T_room, length, flow_LPM)["T_out"]
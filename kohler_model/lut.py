@@ -0,0 +1,277 @@
+"""Precomputed lookup tables for the faucet and valve models.
+
+A table samples a model once on a regular grid of (sqrt hot pressure,
+sqrt cold pressure, lever angle). Orifice flows are close to linear in
+square-root pressure, so a coarse grid is accurate. Queries are answered
+by trilinear interpolation at a constant cost per point, with no search.
+Only the temperature-independent quantities are tabulated (flow, outlet
+pressure and the hot/cold shares of the flow). Temperatures and the
+valve's pipe stage are applied exactly on top of the interpolated values.
+Tables are built at one reference density, REF_RHO. Orifice flow
+depends on pressure and density only through their ratio (or product),
+so a query rescales each inlet pressure by its water-table density, and
+the outlet quantities are then corrected exactly from the interpolated
+shares.
+
+Flows that go as the square root of a pressure (the valve outlet flow) are
+tabulated squared, which keeps them accurate at low pressures.
+
+error_bound holds, per tabulated quantity, the largest interpolation error
+against the exact model over a grid twice as fine, i.e. at every cell
+centre, face and edge midpoint. It is measured, not proven: points between
+those samples may be off by somewhat more. build(tol=...) refines the grid
+until the measured errors are within tolerance; without tol the table is
+kept at the requested resolution whatever its error. Query points outside
+the tabulated pressure/angle range are evaluated with the exact model
+instead.
+
+Precompute every table into a directory with
+
+    python -m kohler_model.lut TABLE_DIR
+"""
+from abc import ABC, abstractmethod
+import os
+import sys
+
+import numpy as np
+
+from .faucet import CARTRIDGES, DP_MIN, faucet_mix
+from .valve import VALVES, _is_shower, _mix_density, valve_mixer, valve_results
+from .water import water_property
+
+REF_RHO = 950.0  # kg/m³, below every density in the water table
+
+# Corner offsets of a grid cell, as (hot, cold, angle) steps
+_CORNERS = [(a, b, c) for a in (0, 1) for b in (0, 1) for c in (0, 1)]
+
+
+class LookupTable(ABC):
+    """Trilinear table over (sqrt hot pressure, sqrt cold pressure, angle).
+
+    values maps each tabulated quantity to a float32 array of shape
+    (layers, n_pressure, n_pressure, n_angle); layers separate discrete
+    variants such as the valve's spout and shower outlets. The quantities
+    named in `squared` are stored squared.
+    """
+
+    kind = None
+    layers = 1
+    p_min_default = 0.0
+    squared = ()
+    _kinds = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        LookupTable._kinds[cls.kind] = cls
+
+    def __init__(self, name, p_min, p_max, values, error_bound, squared=None):
+        self.name = name
+        self.squared = tuple(type(self).squared if squared is None else squared)
+        self.p_min = float(p_min)
+        self.p_max = float(p_max)
+        self.values = values
+        self.error_bound = error_bound
+        _, self.n_pressure, _, self.n_angle = next(iter(values.values())).shape
+
+    # --- Building ---------------------------------------------------------
+    @classmethod
+    @abstractmethod
+    def _sample(cls, name, layer, hot_pressure, cold_pressure, angle):
+        """Exact model quantities (dict of arrays) at the given points."""
+
+    @staticmethod
+    def _mesh(p_min, p_max, n_pressure, n_angle):
+        s = np.linspace(np.sqrt(p_min), np.sqrt(p_max), n_pressure)
+        return np.meshgrid(s, s, np.linspace(-45, 45, n_angle), indexing="ij")
+
+    @classmethod
+    def _tabulate(cls, name, mesh):
+        S_hot, S_cold, A = mesh
+        layers = [cls._sample(name, layer, S_hot**2, S_cold**2, A) for layer in range(cls.layers)]
+        return {key: np.stack([layer[key] for layer in layers]) for key in layers[0]}
+
+    @classmethod
+    def build(cls, name, p_max=10.0, n_pressure=41, n_angle=91, tol=None):
+        """Tabulate model `name` up to p_max bar. tol (dict of quantity ->
+        max error) refines the grid until every measured error is within it."""
+        p_min = cls.p_min_default
+        while True:
+            values = cls._tabulate(name, cls._mesh(p_min, p_max, n_pressure, n_angle))
+            table = cls(name, p_min, p_max,
+                        {key: (v**2 if key in cls.squared else v).astype(np.float32)
+                         for key, v in values.items()}, {})
+
+            fine = cls._mesh(p_min, p_max, 2 * n_pressure - 1, 2 * n_angle - 1)
+            exact = cls._tabulate(name, fine)
+            for key in values:
+                table.error_bound[key] = 0.0
+            for layer in range(cls.layers):
+                approx = table._interpolate(*fine, layer)
+                for key in values:
+                    err = float(np.max(np.abs(approx[key] - exact[key][layer])))
+                    table.error_bound[key] = max(table.error_bound[key], err)
+
+            if not tol or all(table.error_bound[key] <= limit for key, limit in tol.items()):
+                return table
+            n_pressure, n_angle = 2 * n_pressure - 1, 2 * n_angle - 1
+
+    # --- Queries ----------------------------------------------------------
+    def _interpolate(self, s_hot, s_cold, angle, layer):
+        s_lo, s_hi = np.sqrt(self.p_min), np.sqrt(self.p_max)
+        axes = ((s_hot, s_lo, s_hi, self.n_pressure),
+                (s_cold, s_lo, s_hi, self.n_pressure),
+                (angle, -45.0, 45.0, self.n_angle))
+        index, frac = [], []
+        for x, lo, hi, n in axes:
+            u = (x - lo) * ((n - 1) / (hi - lo))
+            i = np.clip(u.astype(np.intp), 0, n - 2)
+            index.append(i)
+            frac.append(u - i)
+
+        strides = (self.n_pressure * self.n_angle, self.n_angle, 1)
+        base = (np.asarray(layer) * self.n_pressure * strides[0]
+                + index[0] * strides[0] + index[1] * strides[1] + index[2])
+        weights = []
+        for corner in _CORNERS:
+            w = 1.0
+            for step, t in zip(corner, frac):
+                w = w * (t if step else 1 - t)
+            weights.append((w, sum(s * c for s, c in zip(strides, corner))))
+
+        result = {}
+        for key, values in self.values.items():
+            flat = values.ravel()
+            result[key] = sum(w * flat[base + offset] for w, offset in weights)
+            if key in self.squared:
+                result[key] = np.sqrt(np.maximum(result[key], 0))
+        return result
+
+    def _lookup(self, hot_pressure, cold_pressure, angle, layer):
+        """Interpolated quantities, with exact model values off the grid."""
+        hot_pressure, cold_pressure, angle, layer = np.broadcast_arrays(
+            np.asarray(hot_pressure, dtype=float), np.asarray(cold_pressure, dtype=float),
+            np.asarray(angle, dtype=float), np.asarray(layer))
+        inside = ((hot_pressure >= self.p_min) & (hot_pressure <= self.p_max)
+                  & (cold_pressure >= self.p_min) & (cold_pressure <= self.p_max)
+                  & (np.abs(angle) <= 45))
+        if inside.all():
+            return self._interpolate(np.sqrt(hot_pressure), np.sqrt(cold_pressure), angle, layer)
+
+        out = {key: np.empty(inside.shape) for key in self.values}
+        approx = self._interpolate(np.sqrt(hot_pressure[inside]), np.sqrt(cold_pressure[inside]),
+                                   angle[inside], layer[inside])
+        outside = ~inside
+        for lay in np.unique(layer[outside]):
+            sel = outside & (layer == lay)
+            exact = self._sample(self.name, lay, hot_pressure[sel], cold_pressure[sel], angle[sel])
+            for key in out:
+                out[key][sel] = exact[key]
+        for key in out:
+            out[key][inside] = approx[key]
+        return out
+
+    # --- Storage ----------------------------------------------------------
+    def save(self, path):
+        arrays = {f"values_{key}": v for key, v in self.values.items()}
+        arrays.update({f"error_{key}": np.float64(e) for key, e in self.error_bound.items()})
+        np.savez_compressed(path, kind=self.kind, name=self.name,
+                            p_range=np.array([self.p_min, self.p_max]),
+                            squared=np.array(self.squared, dtype=str), **arrays)
+
+    @staticmethod
+    def load(path):
+        with np.load(path) as data:
+            cls = LookupTable._kinds[str(data["kind"])]
+            values = {k[len("values_"):]: data[k] for k in data.files if k.startswith("values_")}
+            errors = {k[len("error_"):]: float(data[k]) for k in data.files if k.startswith("error_")}
+            p_min, p_max = data["p_range"]
+            # tables saved before squared storage hold every quantity as is
+            squared = data["squared"].tolist() if "squared" in data.files else ()
+            return cls(str(data["name"]), p_min, p_max, values, errors, squared)
+
+
+class FaucetTable(LookupTable):
+    """Faucet mix for one cartridge; call it like faucet_mix."""
+
+    kind = "faucet"
+    # the model floors the inlet pressure drop here, so lower pressures are identical
+    p_min_default = DP_MIN / 1e5
+
+    @classmethod
+    def _sample(cls, name, layer, hot_pressure, cold_pressure, angle):
+        hot_share, flow_LPM = faucet_mix(1.0, 0.0, hot_pressure, cold_pressure, angle, name,
+                                         rho=REF_RHO)
+        return {"flow_LPM": flow_LPM, "hot_share": hot_share}
+
+    def __call__(self, hot_temp, cold_temp, hot_pressure, cold_pressure, lever_angle):
+        # mass flux goes as sqrt(rho * dP): scale each pressure to the reference density
+        rho_hot = water_property("rho", hot_temp)
+        rho_cold = water_property("rho", cold_temp)
+        q = self._lookup(np.maximum(hot_pressure, self.p_min) * (rho_hot / REF_RHO),
+                         np.maximum(cold_pressure, self.p_min) * (rho_cold / REF_RHO),
+                         lever_angle, 0)
+        hot_share = q["hot_share"]
+        T_mixed = (hot_share * np.asarray(hot_temp, dtype=float)
+                   + (1 - hot_share) * np.asarray(cold_temp, dtype=float))
+        # tabulated flow is mass / REF_RHO; convert each inlet's mass at its own density
+        flow_LPM = q["flow_LPM"] * REF_RHO * (hot_share / rho_hot + (1 - hot_share) / rho_cold)
+        return T_mixed[()], flow_LPM[()]
+
+
+class ValveTable(LookupTable):
+    """Valve mixer for one valve model; call it like calculate_valve."""
+
+    kind = "valve"
+    layers = 2  # spout, shower
+    p_min_default = 0.1
+    squared = ("flow_LPM",)
+
+    @classmethod
+    def _sample(cls, name, layer, hot_pressure, cold_pressure, angle):
+        Q_out, P_out, hot_share, cold_share = valve_mixer(hot_pressure, cold_pressure, angle,
+                                                          bool(layer), name, REF_RHO, REF_RHO)
+        return {"flow_LPM": Q_out * 60000, "P_out_bar": P_out / 1e5,
+                "hot_share": hot_share, "cold_share": cold_share}
+
+    def __call__(self, hotP, coldP, hotT, coldT, theta, outletChoice, pipeLen, pipeDia):
+        shower = _is_shower(outletChoice)
+        hotP = np.asarray(hotP, dtype=float)
+        coldP = np.asarray(coldP, dtype=float)
+        rho_hot = water_property("rho", hotT)
+        rho_cold = water_property("rho", coldT)
+        # inlet flows go as sqrt(P / rho): scale each pressure to the reference density
+        hotP_ref = hotP * (REF_RHO / rho_hot)
+        coldP_ref = coldP * (REF_RHO / rho_cold)
+        q = self._lookup(hotP_ref, coldP_ref, theta, np.asarray(shower, dtype=np.intp))
+        hot_share, cold_share = q["hot_share"], q["cold_share"]
+        T_mix = hot_share * np.asarray(hotT, dtype=float) + cold_share * np.asarray(coldT, dtype=float)
+
+        # Outlet flow goes as sqrt(P_mix / rho_mix) and outlet pressure as P_mix
+        P_mix = hot_share * hotP + cold_share * coldP
+        P_mix_ref = hot_share * hotP_ref + cold_share * coldP_ref
+        rho_mix = _mix_density(hot_share, cold_share, rho_hot, rho_cold)
+        ratio = np.where(P_mix_ref > 0, P_mix / np.where(P_mix_ref > 0, P_mix_ref, 1.0), 0.0)
+        Q_out = q["flow_LPM"] / 60000 * np.sqrt(ratio * REF_RHO / rho_mix)
+        P_out = q["P_out_bar"] * 1e5 * ratio
+        return valve_results(Q_out, P_out, T_mix, shower, pipeLen, pipeDia, rho_mix)
+
+
+def precompute(directory, **build_kwargs):
+    """Build and save a table per cartridge and per valve; returns the paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for cls, names in ((FaucetTable, CARTRIDGES), (ValveTable, VALVES)):
+        for name in names:
+            path = os.path.join(directory, f"{cls.kind}_{name}.npz")
+            cls.build(name, **build_kwargs).save(path)
+            paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m kohler_model.lut TABLE_DIR")
+    for path in precompute(sys.argv[1]):
+        table = LookupTable.load(path)
+        bounds = ", ".join(f"{key} ±{err:.2g}" for key, err in table.error_bound.items())
+        print(f"{path}: {bounds}")
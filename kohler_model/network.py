@@ -0,0 +1,253 @@
+"""Hydraulic network solver for several outlets open at once.
+
+A network is a list of edges between named nodes. Each edge carries
+turbulent (square-law) flow, Q = c·sqrt(ΔP), where the conductance c
+(m³/s per √Pa) comes from a K-factor, a pipe or a fixture rating. Series
+elements on one edge combine with series(). Supplies and outlets are nodes
+at a fixed pressure; the pressures at the other nodes follow from mass
+balance. They are found by Newton iteration (the global gradient method:
+edge laws linearized, node balances solved exactly each step) on all
+configurations at once: conductances, fixed pressures and lifts may be
+arrays, and every batch entry is solved in the same vectorized steps. Node temperatures are then
+the flow-weighted mix of everything flowing in.
+
+valve_network builds the Anthem-style case: hot and cold supplies through
+the valve cartridge into one mixing chamber, then one branch per outlet
+(valve port, pipe and fixture in series) to atmosphere, with any subset of
+the outlets open.
+"""
+import numpy as np
+
+from .valve import F_PIPE, G, valve_params
+from .water import water_property
+
+# Nominal fixture ratings, (flow in LPM, at pressure in bar); replace with
+# bench data for a specific product
+FIXTURES = {
+    'Spout': (20.0, 3.0),
+    'Handshower': (9.5, 3.0),
+    'Showerhead': (9.5, 3.0),
+    'Rain Panel': (12.0, 3.0),
+    'Body Jet -1': (4.0, 3.0),
+    'Body Jet -2': (4.0, 3.0),
+}
+SHOWER_OUTLETS = {'Handshower', 'Showerhead', 'Rain Panel', 'Body Jet -1', 'Body Jet -2'}
+
+RHO = 1000.0   # kg/m³, default density for the lift terms
+Q_FLOOR = 1e-12  # m³/s, keeps the linearized edge laws finite at zero flow
+
+
+# --- Conductances ---
+
+def orifice_conductance(K, area, rho=RHO):
+    """c of a K-factor loss at velocity area `area` (m²): ΔP = K ρ v² / 2."""
+    return np.asarray(area, dtype=float) * np.sqrt(2 / (np.asarray(rho, dtype=float) * np.asarray(K, dtype=float)))
+
+
+def pipe_conductance(length, diameter, f=F_PIPE, rho=RHO):
+    """c of a straight pipe, length and diameter in m, friction factor f."""
+    D = np.asarray(diameter, dtype=float)
+    K = np.asarray(f, dtype=float) * np.asarray(length, dtype=float) / D
+    return orifice_conductance(K, np.pi * (D / 2) ** 2, rho)
+
+
+def rated_conductance(flow_LPM, pressure_bar):
+    """c of a fixture rated at flow_LPM when pressure_bar is across it."""
+    return np.asarray(flow_LPM, dtype=float) / 60000 / np.sqrt(np.asarray(pressure_bar, dtype=float) * 1e5)
+
+
+def series(*conductances):
+    """c of elements in series (a zero conductance closes the edge)."""
+    c = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in conductances))
+    with np.errstate(divide="ignore"):
+        inv = sum(np.where(x > 0, 1 / np.where(x > 0, x, 1.0) ** 2, np.inf) for x in c)
+    return np.where(np.isfinite(inv), 1 / np.sqrt(inv), 0.0)
+
+
+# --- Solver ---
+
+def _solve(J, F):
+    # Batched J x = F; rows of nodes cut off by closed edges give 0
+    if J.shape[-1] == 0:
+        return np.zeros(F.shape)
+    dead = np.all(J == 0, axis=-1)
+    J = np.where(dead[..., None] & np.eye(J.shape[-1], dtype=bool), 1.0, J)
+    return np.linalg.solve(J, np.where(dead, 0.0, F)[..., None])[..., 0]
+
+
+def solve_network(edges, pressures, temps=None, rho=RHO, tol=1e-10, max_iter=100):
+    """Steady pressures, flows and temperatures of a pipe network.
+
+    edges is a list of (from, to, conductance) or (from, to, conductance,
+    lift_m) tuples; lift_m is the rise from `from` to `to` (m). pressures
+    maps each fixed-pressure node (supplies, outlets to atmosphere = 0) to
+    its pressure in bar, and temps maps the nodes water enters by (the
+    supplies) to their temperature in °C. Conductances, pressures, lifts
+    and temperatures may be arrays; they broadcast to one batch of
+    networks with the same layout.
+
+    Returns a dict with pressure (node -> bar, NaN for nodes whose edges
+    are all closed), flow (LPM per edge, in edge order, positive from ->
+    to), temp (node -> °C, NaN where nothing flows in), converged (per
+    network) and iterations.
+    """
+    temps = dict(temps or {})
+    nodes = list(dict.fromkeys(name for edge in edges for name in edge[:2]))
+    unknown = set(pressures) - set(nodes)
+    if unknown:
+        raise ValueError(f"Fixed-pressure node(s) {sorted(unknown)} are on no edge")
+    free = [name for name in nodes if name not in pressures]
+    index = {name: i for i, name in enumerate(nodes)}
+    src = np.array([index[e[0]] for e in edges])
+    dst = np.array([index[e[1]] for e in edges])
+
+    lifts = [e[3] if len(e) > 3 else 0.0 for e in edges]
+    values = np.broadcast_arrays(*[np.asarray(e[2], dtype=float) for e in edges],
+                                 *[np.asarray(v, dtype=float) for v in pressures.values()],
+                                 *[np.asarray(v, dtype=float) for v in lifts],
+                                 *[np.asarray(v, dtype=float) for v in temps.values()],
+                                 np.asarray(rho, dtype=float))
+    shape = values[0].shape
+    flat = [v.reshape(-1) for v in values]
+    E, Nf = len(edges), len(pressures)
+    c = np.stack(flat[:E], axis=-1)                                   # (B, E)
+    head = np.stack(flat[E + Nf:2 * E + Nf], axis=-1) * flat[-1][:, None] * G
+    B = c.shape[0]
+
+    # Incidence of the free nodes: +1 where an edge flows in, -1 where it leaves
+    A = np.zeros((len(free), E))
+    for k, name in enumerate(free):
+        A[k, dst == index[name]] += 1
+        A[k, src == index[name]] -= 1
+
+    p = np.zeros((B, len(nodes)))
+    for name, value in zip(pressures, flat[E:E + Nf]):
+        p[:, index[name]] = value * 1e5
+    free_idx = np.array([index[name] for name in free], dtype=int)
+
+    # Global gradient (Todini-Pilati) iteration: Newton on the edge laws with
+    # the node balances solved exactly at every step, starting from the
+    # linear (laminar-like) network. dP = d0 - A^T p_free on every edge.
+    d0 = p[:, src] - p[:, dst] - head
+    H = _solve(np.einsum("ne,be,me->bnm", A, c, A), (c * d0) @ A.T)
+    dP = d0 - H @ A
+    Q = c * np.sign(dP) * np.sqrt(np.abs(dP))
+
+    converged = np.zeros(B, dtype=bool)
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        W = c**2 / (2 * np.maximum(np.abs(Q), Q_FLOOR))  # 1 / (dΔP/dQ)
+        H = _solve(np.einsum("ne,be,me->bnm", A, W, A), (W * d0 + Q / 2) @ A.T)
+        Q_new = Q / 2 + W * (d0 - H @ A)
+        change = np.abs(Q_new - Q).max(axis=1) / (np.abs(Q_new).sum(axis=1) + 1e-15)
+        Q = Q_new
+        converged = change <= tol
+        if converged.all():
+            break
+    # nodes cut off by closed edges have no pressure
+    p[:, free_idx] = np.where((c > 0) @ (A != 0).T, H, np.nan)
+
+    # Temperatures: every node without a given temperature is the
+    # flow-weighted mix of its inflows
+    known = {index[name]: np.asarray(T, dtype=float).reshape(-1)
+             for name, T in zip(temps, flat[2 * E + Nf:-1])}
+    mixed = [i for i in range(len(nodes)) if i not in known]
+    T = np.full((B, len(nodes)), np.nan)
+    for i, value in known.items():
+        T[:, i] = value
+    if mixed:
+        pos = {i: k for k, i in enumerate(mixed)}
+        M = np.zeros((B, len(mixed), len(mixed)))
+        rhs = np.zeros((B, len(mixed)))
+        q_in = [(np.maximum(Q[:, e], 0), src[e], dst[e]) for e in range(E)]
+        q_in += [(np.maximum(-Q[:, e], 0), dst[e], src[e]) for e in range(E)]
+        for q, frm, to in q_in:
+            if to not in pos:
+                continue
+            M[:, pos[to], pos[to]] += q
+            if frm in pos:
+                M[:, pos[to], pos[frm]] -= q
+            else:
+                rhs[:, pos[to]] += q * T[:, frm]
+        fed = M[:, np.arange(len(mixed)), np.arange(len(mixed))] > 0
+        T[:, mixed] = np.where(fed, _solve(M, rhs), np.nan)
+
+    def shaped(a):
+        return a.reshape(shape)[()]
+
+    return {
+        "pressure": {name: shaped(p[:, index[name]] / 1e5) for name in nodes},
+        "flow": [shaped(Q[:, e] * 60000) for e in range(E)],
+        "temp": {name: shaped(T[:, index[name]]) for name in nodes},
+        "converged": shaped(converged),
+        "iterations": iterations,
+    }
+
+
+def valve_network(hotP, coldP, hotT, coldT, theta, outlets, open_outlets=True,
+                  pipeLen=1.0, pipeDia=18.4, lift=0.0, model="AT360"):
+    """Flow split over the valve's outlets with any subset of them open.
+
+    outlets lists the outlet types (FIXTURES keys) on the last axis;
+    open_outlets, pipeLen (m), pipeDia (mm) and lift (m, rise from valve to
+    outlet) broadcast against it. Supply pressures (bar), temperatures
+    (°C) and the lever angle theta (°) broadcast over the leading axes, so
+    thousands of configurations solve in one call. Shower-type outlets
+    take the valve's shower port loss, the spout its spout port loss.
+
+    Returns a dict of arrays: per outlet "Outlet Flow (LPM)" and
+    "Outlet Pressure (bar)" (just upstream of the fixture), and per
+    configuration "Total Flow (LPM)", "Hot Flow (LPM)", "Cold Flow (LPM)",
+    "Mixer Pressure (bar)", "Mixed Water Temperature (°C)" and "converged".
+    """
+    outlets = list(outlets)
+    unknown = [name for name in outlets if name not in FIXTURES]
+    if unknown:
+        raise ValueError(f"Unknown outlet(s) {unknown}; expected one of {list(FIXTURES)}")
+    p = valve_params(model)
+    A_throat = np.pi * (np.asarray(p["D_throat"]) / 2) ** 2
+    A_outlet = np.pi * (np.asarray(p["D_outlet"]) / 2) ** 2
+    K_in = np.asarray(p["K_inlet"]) + np.asarray(p["K_cart"])
+
+    lever = (np.asarray(theta, dtype=float) + 45) / 90
+    rho_hot = water_property("rho", hotT)
+    rho_cold = water_property("rho", coldT)
+    rho_mix = 0.5 * (rho_hot + rho_cold)
+    edges = [
+        ("hot", "mix", orifice_conductance(K_in, (1 - lever) * A_throat, rho_hot)),
+        ("cold", "mix", orifice_conductance(K_in, lever * A_throat, rho_cold)),
+    ]
+
+    def per_outlet(x, dtype=float):
+        x = np.asarray(x, dtype=dtype)
+        return np.broadcast_to(x, np.broadcast_shapes(x.shape, (len(outlets),)))
+
+    is_open = per_outlet(open_outlets, bool)
+    L = per_outlet(pipeLen)
+    D = per_outlet(pipeDia) / 1000
+    rise = per_outlet(lift)
+    pressures = {"hot": hotP, "cold": coldP}
+    for i, name in enumerate(outlets):
+        K_port = p["K_out_shower"] if name in SHOWER_OUTLETS else p["K_out_spout"]
+        c = series(orifice_conductance(K_port, A_outlet, rho_mix),
+                   pipe_conductance(L[..., i], D[..., i], F_PIPE, rho_mix),
+                   rated_conductance(*FIXTURES[name]))
+        # the fixture discharges to atmosphere
+        edges.append(("mix", f"out {i}", np.where(is_open[..., i], c, 0.0), rise[..., i]))
+        pressures[f"out {i}"] = 0.0
+
+    net = solve_network(edges, pressures, {"hot": hotT, "cold": coldT}, rho_mix)
+    flows = np.stack(np.broadcast_arrays(*net["flow"][2:]), axis=-1)
+    # pressure just upstream of each fixture, from its own rating
+    fixture_c = np.array([rated_conductance(*FIXTURES[name]) for name in outlets])
+    outlet_P = (flows / 60000 / fixture_c) ** 2 / 1e5
+    return {
+        "Outlet Flow (LPM)": flows,
+        "Outlet Pressure (bar)": outlet_P,
+        "Total Flow (LPM)": flows.sum(axis=-1),
+        "Hot Flow (LPM)": net["flow"][0],
+        "Cold Flow (LPM)": net["flow"][1],
+        "Mixer Pressure (bar)": net["pressure"]["mix"],
+        "Mixed Water Temperature (°C)": net["temp"]["mix"],
+        "converged": net["converged"],
+    }
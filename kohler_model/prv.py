@@ -0,0 +1,67 @@
+"""Pressure reducing valve placement along a falling pipeline.
+
+Every argument may be a scalar or an array (one entry per pipeline).
+prv_plan adds a status per pipeline instead of failing, so a whole
+project inventory can be placed in one pass. The static head uses
+RHO = 1000 kg/m³ unless a water_temp (°C) is given, which takes the
+density from the water property table instead.
+"""
+import numpy as np
+
+from .water import water_property
+
+RHO = 1000  # kg/m³
+G = 9.81    # m/s²
+
+# status -> message shown for pipelines that cannot be placed
+STATUS_MESSAGES = {
+    "ok": "",
+    "missing_input": "Please fill all fields with non-zero values.",
+    "negative_input": "Lengths, elevation drop and target pressure must be positive.",
+    "drop_too_small": "The elevation drop cannot build the target pressure; no PRV position gives it.",
+}
+
+
+def _density(water_temp):
+    return RHO if water_temp is None else water_property("rho", water_temp)
+
+
+def prv_placement(total_length, elevation_drop, target_pressure_bar, water_temp=None):
+    """Distances (L1 from the inlet, L2 from the outlet) in m at which to place
+    the PRV so the static head below it gives the target outlet pressure."""
+    P_target_Pa = np.asarray(target_pressure_bar, dtype=float) * 1e5  # in Pascal
+    total_length = np.asarray(total_length, dtype=float)
+    elevation_drop = np.asarray(elevation_drop, dtype=float)
+
+    required_height = P_target_Pa / (_density(water_temp) * G)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        elevation_fraction = required_height / elevation_drop
+    L2 = elevation_fraction * total_length
+    L1 = total_length - L2
+    return L1[()], L2[()]
+
+
+def prv_status(total_length, elevation_drop, target_pressure_bar, water_temp=None):
+    """Validation flag per pipeline, one of the STATUS_MESSAGES keys."""
+    inputs = np.broadcast_arrays(np.asarray(total_length, dtype=float),
+                                 np.asarray(elevation_drop, dtype=float),
+                                 np.asarray(target_pressure_bar, dtype=float))
+    total_length, elevation_drop, target_pressure_bar = inputs
+
+    required_height = target_pressure_bar * 1e5 / (_density(water_temp) * G)
+    missing = np.logical_or.reduce([(x == 0) | np.isnan(x) for x in inputs])
+    negative = np.logical_or.reduce([x < 0 for x in inputs])
+    return np.select([missing, negative, required_height > elevation_drop],
+                     ["missing_input", "negative_input", "drop_too_small"], "ok")[()]
+
+
+def prv_plan(total_length, elevation_drop, target_pressure_bar, water_temp=None):
+    """L1, L2 (NaN where the pipeline cannot be placed) and status, as a dict."""
+    L1, L2 = prv_placement(total_length, elevation_drop, target_pressure_bar, water_temp)
+    status = prv_status(total_length, elevation_drop, target_pressure_bar, water_temp)
+    ok = status == "ok"
+    return {
+        "L1": np.where(ok, L1, np.nan)[()],
+        "L2": np.where(ok, L2, np.nan)[()],
+        "status": status,
+    }
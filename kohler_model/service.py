@@ -0,0 +1,257 @@
+"""Local HTTP/JSON service for the models, with request micro-batching.
+
+    python -m kohler_model.service --port 8765
+
+    POST /models/<name>   a JSON object of inputs (one operating point), or a
+                          list of them -> the outputs, in the same shape
+    GET  /models          inputs (with their defaults) and outputs of each model
+    GET  /metrics         per model: requests, errors, p50/p99 latency, batches
+    GET  /health
+
+Inputs left out take the UI defaults, as with evaluate(). Concurrent
+requests for the same model are coalesced: the first point opens a window
+of window_ms, and everything that arrives within it (up to max_batch
+points) is evaluated as one vectorized call, each request getting its own
+row back. If the batch fails (e.g. one unknown cartridge) its points are
+rerun one by one so only the bad request gets the error.
+
+Only the standard library and NumPy are used; the HTTP side is a minimal
+HTTP/1.1 server with keep-alive on asyncio streams, meant for local tools,
+not the open internet.
+"""
+import argparse
+import asyncio
+from collections import deque
+import json
+import math
+import time
+
+import numpy as np
+
+from .api import MODELS, evaluate, model_spec
+
+WINDOW_MS = 2.0
+MAX_BATCH = 1024
+KEEP = 10000  # latencies and batch sizes kept per model for the metrics
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            500: "Internal Server Error"}
+
+
+def _json_value(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def evaluate_rows(name, points):
+    """Outputs of model `name` for a list of input dicts, as one vectorized call.
+
+    Returns one output dict per point, or the exception for points that
+    cannot be evaluated.
+    """
+    spec = model_spec(name)
+    columns = {key: [point.get(key, default) for point in points]
+               for key, default in spec["inputs"].items()}
+    try:
+        results = evaluate(name, columns)
+        rows = {key: np.broadcast_to(np.asarray(value), (len(points),)).tolist()
+                for key, value in results.items()}
+    except (ValueError, TypeError, KeyError) as exc:
+        if len(points) == 1:
+            return [exc]
+        return [evaluate_rows(name, [point])[0] for point in points]
+    return [{key: _json_value(rows[key][i]) for key in spec["outputs"]}
+            for i in range(len(points))]
+
+
+class Metrics:
+    """Rolling request latencies and batch sizes per model."""
+
+    def __init__(self, keep=KEEP):
+        self.started = time.monotonic()
+        self.requests = dict.fromkeys(MODELS, 0)
+        self.errors = dict.fromkeys(MODELS, 0)
+        self.latency = {name: deque(maxlen=keep) for name in MODELS}
+        self.batches = {name: deque(maxlen=keep) for name in MODELS}
+
+    def request(self, name, seconds, ok):
+        self.requests[name] += 1
+        self.errors[name] += not ok
+        self.latency[name].append(seconds * 1000)
+
+    def batch(self, name, size):
+        self.batches[name].append(size)
+
+    def snapshot(self):
+        uptime = time.monotonic() - self.started
+        report = {"uptime_s": round(uptime, 3), "models": {}}
+        for name in MODELS:
+            if not self.requests[name]:
+                continue
+            latency = np.array(self.latency[name])
+            batches = np.array(self.batches[name])
+            report["models"][name] = {
+                "requests": self.requests[name],
+                "errors": self.errors[name],
+                "requests_per_s": round(self.requests[name] / uptime, 1),
+                "p50_ms": round(float(np.percentile(latency, 50)), 3),
+                "p99_ms": round(float(np.percentile(latency, 99)), 3),
+                "batches": len(batches),
+                "mean_batch": round(float(batches.mean()), 2) if len(batches) else 0,
+                "max_batch": int(batches.max()) if len(batches) else 0,
+            }
+        return report
+
+
+class Batcher:
+    """Coalesces the points submitted within one window into one evaluation."""
+
+    def __init__(self, name, metrics, window_ms=WINDOW_MS, max_batch=MAX_BATCH):
+        self.name = name
+        self.metrics = metrics
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.pending = []
+        self.timer = None
+
+    def submit(self, point):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((point, future))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+        return future
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+        self.metrics.batch(self.name, len(pending))
+        try:
+            rows = evaluate_rows(self.name, [p for p, _ in pending])
+        except Exception as exc:  # never leave a request of the batch waiting
+            rows = [exc] * len(pending)
+        for (_, future), row in zip(pending, rows):
+            if future.done():
+                continue
+            if isinstance(row, Exception):
+                future.set_exception(row)
+            else:
+                future.set_result(row)
+
+
+class ModelService:
+    """The HTTP front end; one Batcher per model."""
+
+    def __init__(self, window_ms=WINDOW_MS, max_batch=MAX_BATCH):
+        self.metrics = Metrics()
+        self.batchers = {name: Batcher(name, self.metrics, window_ms, max_batch)
+                         for name in MODELS}
+
+    async def start(self, host="127.0.0.1", port=8765):
+        return await asyncio.start_server(self._connection, host, port)
+
+    async def predict(self, name, body):
+        """Outputs for a point (dict) or list of points; raises ValueError on bad input."""
+        points = body if isinstance(body, list) else [body]
+        inputs = MODELS[name]["inputs"]
+        for point in points:
+            if not isinstance(point, dict):
+                raise ValueError("Expected a JSON object of inputs or a list of them")
+            unknown = set(point) - set(inputs)
+            if unknown:
+                raise ValueError(f"Unknown {name} input(s) {sorted(unknown)}; expected {list(inputs)}")
+            for key, value in point.items():
+                if not isinstance(value, (int, float, str)):
+                    raise ValueError(f"Input {key!r} must be a number or string, not {type(value).__name__}; "
+                                     "post a list of points for several operating points")
+        rows = await asyncio.gather(*(self.batchers[name].submit(point) for point in points))
+        return rows if isinstance(body, list) else rows[0]
+
+    async def route(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/metrics":
+            return 200, self.metrics.snapshot()
+        if path == "/models":
+            return 200, {name: {"inputs": spec["inputs"], "outputs": spec["outputs"]}
+                         for name, spec in MODELS.items()}
+        name = path[len("/models/"):] if path.startswith("/models/") else None
+        if name not in MODELS:
+            return 404, {"error": f"Unknown path {path!r}"}
+        if method != "POST":
+            return 405, {"error": "POST a JSON object of inputs"}
+
+        start = time.perf_counter()
+        try:
+            result = 200, await self.predict(name, json.loads(body or b"{}"))
+        except (ValueError, TypeError, KeyError) as exc:  # includes malformed JSON
+            result = 400, {"error": str(exc)}
+        except Exception as exc:  # a model bug: answer it rather than drop the connection
+            result = 500, {"error": f"{type(exc).__name__}: {exc}"}
+        self.metrics.request(name, time.perf_counter() - start, result[0] == 200)
+        return result
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, target, version = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = header.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length") or 0))
+
+                status, payload = await self.route(method, target.split("?")[0], body)
+                data = json.dumps(payload).encode()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                             .encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # client went away or sent something that is not HTTP
+        finally:
+            writer.close()
+
+
+async def serve(host="127.0.0.1", port=8765, window_ms=WINDOW_MS, max_batch=MAX_BATCH):
+    server = await ModelService(window_ms, max_batch).start(host, port)
+    print(f"serving the models on http://{host}:{port}/models", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m kohler_model.service",
+                                     description="Local HTTP/JSON service for the models.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--window-ms", type=float, default=WINDOW_MS,
+                        help="how long a batch waits for more requests (default: %(default)s)")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH,
+                        help="points per vectorized call (default: %(default)s)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.window_ms, args.max_batch))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,67 @@
+"""Shower heat-loss model: nozzle jet flow and the temperature drop to the user."""
+import numpy as np
+
+from .water import water_properties, water_property
+
+H_FG = 2257000       # J/kg
+SIGMA = 5.67e-8      # W/m²K⁴
+EMISSIVITY = 0.95
+REL_HUMIDITY = 0.5   # Moderate humidity
+H_AIR = 60           # W/m²K
+Q_MAX_LPM = 12       # showerhead flow cap
+
+
+def shower_flow(pressure, nozzle_dia, num_nozzles, temp=40.0):
+    """Total jet flow (m³/s) through the showerhead, capped at Q_MAX_LPM.
+    pressure in bar, nozzle_dia in mm, temp (°C) sets the water density;
+    any argument may be an array."""
+    P = np.asarray(pressure, dtype=float) * 1e5  # bar to Pa
+    d_nozzle = np.asarray(nozzle_dia, dtype=float) / 1000  # mm to m
+    v = np.sqrt(2 * P / water_property("rho", temp))
+    A_nozzle = np.pi * (d_nozzle / 2)**2
+    Q_single = A_nozzle * v  # m³/s
+    Q_total = Q_single * np.asarray(num_nozzles, dtype=float)
+
+    # Restrict flow rate to max 12 LPM
+    return np.minimum(Q_total, Q_MAX_LPM / 60000)[()]
+
+
+def shower_outlet_temp(temp, pressure, nozzle_dia, num_nozzles, air_temp):
+    """Final water temperature (°C) after convective, evaporative, radiative
+    and surface losses. pressure in bar, nozzle_dia in mm; any argument may
+    be an array."""
+    d_nozzle = np.asarray(nozzle_dia, dtype=float) / 1000  # mm to m
+    T_w = np.asarray(temp, dtype=float)
+    T_air = np.asarray(air_temp, dtype=float)
+    props = water_properties(T_w)
+    rho, c_p = props["rho"], props["cp"]
+
+    m_dot = rho * shower_flow(pressure, nozzle_dia, num_nozzles, T_w)
+    d_droplet = d_nozzle
+    A_surface_total = np.pi * d_droplet**2 * np.asarray(num_nozzles, dtype=float)
+
+    # Heat losses per unit heat capacity flow (K). Each term only carries the
+    # axes of its own inputs, so a broadcast sweep expands to full size in
+    # the last few operations only.
+    dT_air = T_w - T_air
+    surface_per_flow = A_surface_total / (m_dot * c_p)
+    q_conv_rad = H_AIR * dT_air + EMISSIVITY * SIGMA * ((T_w + 273.15)**4 - (T_air + 273.15)**4)
+
+    evap_fraction = 0.01 * REL_HUMIDITY
+    dT_evap = evap_fraction * H_FG / c_p  # q_evap = m_evap * H_FG
+
+    dT_surface = 0.015 * dT_air  # q_surface = 0.015 * m_dot * c_p * dT_air
+
+    deltaT_total = surface_per_flow * q_conv_rad + (dT_surface + dT_evap)
+    return (T_w - deltaT_total)[()]
+
+
+def shower_sweep(temp, pressure, nozzle_dia, num_nozzles, air_temp):
+    """Evaluate every combination of the candidate values (scalars or 1-D
+    arrays) of each input. Returns (T_final, flow_LPM) as arrays of shape
+    (temp, pressure, nozzle_dia, num_nozzles, air_temp)."""
+    axes = np.ix_(*(np.atleast_1d(np.asarray(values, dtype=float)).ravel()
+                    for values in (temp, pressure, nozzle_dia, num_nozzles, air_temp)))
+    T_final = shower_outlet_temp(*axes)
+    flow_LPM = np.broadcast_to(shower_flow(*axes[1:4], axes[0]) * 60000, T_final.shape)
+    return T_final, flow_LPM
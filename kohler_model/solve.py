@@ -0,0 +1,108 @@
+"""Inverse models: the lever angle that gives a target outlet temperature.
+
+Both mixers blend the hot and cold streams in proportion to the open port
+fractions, so the hot share of the flow is a Möbius function of the lever
+position and inverts in closed form. Where a model clamp breaks that form
+(the valve's Q_MIN floor at near-zero flow) the angle is refined by a
+vectorized bisection on the forward model, which is monotonic in the lever.
+
+Targets and inlet conditions broadcast together, so thousands of targets
+invert in one call. Unreachable targets (outside the inlet temperature
+range) give NaN, or the nearest end stop with clip=True.
+"""
+import numpy as np
+
+from .faucet import C_D, _densities, _mass_flux, faucet_mix
+from .valve import _is_shower, calculate_valve, valve_mixer, valve_params
+from .water import water_property
+
+
+def _hot_share(target_temp, hot_temp, cold_temp, clip):
+    # Fraction of the outlet flow that must come from the hot inlet
+    target_temp = np.asarray(target_temp, dtype=float)
+    hot_temp = np.asarray(hot_temp, dtype=float)
+    cold_temp = np.asarray(cold_temp, dtype=float)
+    span = hot_temp - cold_temp
+    same = span == 0
+    share = (target_temp - cold_temp) / np.where(same, 1.0, span)
+    # equal inlet temperatures: every angle gives the target or none does
+    share = np.where(same, np.where(target_temp == hot_temp, 0.5, np.nan), share)
+    if clip:
+        return np.clip(share, 0, 1)
+    return np.where((share >= 0) & (share <= 1), share, np.nan)
+
+
+def _bisect(residual, lo, hi, iters=50):
+    """Vectorized bisection for residual(x) = 0 with a sign change on [lo, hi]."""
+    lo, hi = np.broadcast_arrays(np.asarray(lo, dtype=float), np.asarray(hi, dtype=float))
+    lo, hi = lo.copy(), hi.copy()
+    sign_lo = np.sign(residual(lo))
+    for _ in range(iters):
+        mid = 0.5 * (lo + hi)
+        left = np.sign(residual(mid)) == sign_lo
+        lo = np.where(left, mid, lo)
+        hi = np.where(left, hi, mid)
+    return 0.5 * (lo + hi)
+
+
+def faucet_angle_for_temp(target_temp, hot_temp, cold_temp, hot_pressure, cold_pressure,
+                          cartridge="26mm", rho=None, C_d=C_D, clip=False):
+    """Lever angle (°) giving target_temp at the faucet outlet, and the flow
+    (LPM) at that angle. Returns (lever_angle, flow_LPM)."""
+    share = _hot_share(target_temp, hot_temp, cold_temp, clip)
+    rho_hot, rho_cold = _densities(rho, hot_temp, cold_temp)
+    G_hot = _mass_flux(hot_pressure, rho_hot, C_d)
+    G_cold = _mass_flux(cold_pressure, rho_cold, C_d)
+
+    # share = lever G_hot / (lever G_hot + (1 - lever) G_cold), solved for lever
+    lever = share * G_cold / (share * G_cold + (1 - share) * G_hot)
+    lever_angle = 45 - 90 * lever
+
+    _, flow_LPM = faucet_mix(hot_temp, cold_temp, hot_pressure, cold_pressure,
+                             lever_angle, cartridge, rho, C_d)
+    flow_LPM = np.where(np.isnan(lever_angle), np.nan, flow_LPM)
+    return lever_angle[()], flow_LPM[()]
+
+
+def valve_angle_for_temp(target_temp, hotP, coldP, hotT, coldT, outletChoice="Spout",
+                         pipeLen=1.0, pipeDia=18.4, model="AT360", at_pipe_end=False,
+                         clip=False, tol=1e-6):
+    """Lever angle theta (°) giving target_temp from the valve, with the full
+    calculate_valve results at that angle. The target is the mixed water
+    temperature, or the final pipe temperature with at_pipe_end=True.
+    Returns (theta, results)."""
+    if at_pipe_end:
+        target_temp = np.asarray(target_temp, dtype=float) + 0.2 * np.asarray(pipeLen, dtype=float)
+    share = _hot_share(target_temp, hotT, coldT, clip)
+    p = valve_params(model)
+    K_in = np.asarray(p["K_inlet"]) + np.asarray(p["K_cart"])
+    rho_hot = water_property("rho", hotT)
+    rho_cold = water_property("rho", coldT)
+    a_hot = np.sqrt(np.asarray(hotP, dtype=float) / (rho_hot * K_in))
+    a_cold = np.sqrt(np.asarray(coldP, dtype=float) / (rho_cold * K_in))
+
+    # share = (1 - lever) a_hot / ((1 - lever) a_hot + lever a_cold), solved for lever
+    denom = share * a_cold + (1 - share) * a_hot
+    lever = np.where(denom > 0, (1 - share) * a_hot / np.where(denom > 0, denom, 1.0), np.nan)
+    theta = np.clip(90 * lever - 45, -45, 45)
+
+    # The closed form ignores the Q_MIN floor; bisect the points it misses
+    shower = _is_shower(outletChoice)
+    hotT = np.asarray(hotT, dtype=float)
+    coldT = np.asarray(coldT, dtype=float)
+    T_target = share * hotT + (1 - share) * coldT
+
+    def residual(angle):
+        _, _, hot_share, cold_share = valve_mixer(hotP, coldP, angle, shower, model,
+                                                  rho_hot, rho_cold)
+        return hot_share * hotT + cold_share * coldT - T_target
+
+    miss = ~(np.abs(residual(theta)) <= tol) & ~np.isnan(share)
+    if np.any(miss):
+        # no sign change means no flow to mix at all
+        bracketed = np.sign(residual(-45.0)) != np.sign(residual(45.0))
+        theta = np.where(miss, np.where(bracketed, _bisect(residual, -45.0, 45.0), np.nan), theta)
+
+    results = calculate_valve(hotP, coldP, hotT, coldT, theta, outletChoice, pipeLen, pipeDia,
+                              model)
+    return theta[()], results
@@ -0,0 +1,218 @@
+"""Parallel full-factorial sweeps of the models.
+
+A grid gives a list of values for each swept model input; the sweep covers
+every combination (C order, first input slowest) and the other inputs keep
+their fixed values or UI defaults. The flat range of grid points is cut
+into chunks that a process pool evaluates with the vectorized engines.
+Only chunk bounds travel to the workers: each writes its outputs straight
+into one shared buffer (a shared-memory block, or a .npy file that every
+worker maps) and sends back just the chunk's summary, count, mean, spread
+and extremes, which are merged into the sweep summary. A grid too large
+to keep can therefore be summarized in constant memory, and the work
+scales with the number of cores.
+
+    python -m kohler_model.sweep valve grid.json -o results.npy --workers 16
+
+where grid.json maps inputs to value lists, e.g. {"theta": [-45, 0, 45],
+"model": ["AT235", "AT360"]}.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+from multiprocessing.shared_memory import SharedMemory
+import os
+import sys
+
+import numpy as np
+
+from .api import evaluate, model_spec
+
+CHUNK_SIZE = 1_000_000  # grid points per task
+
+# Per process: the sweep being evaluated and its output buffer
+_state = {}
+
+
+def _init(model, axes, fixed, outputs, target):
+    _state.update(model=model, axes=axes, fixed=fixed, outputs=outputs, buffer=None,
+                  shape=tuple(len(values) for values in axes.values()))
+    kind, ref = target
+    dtype = np.dtype([(key, "f8") for key in outputs])
+    if kind == "memory":
+        _state["shm"] = SharedMemory(name=ref)
+        _state["buffer"] = np.ndarray(int(np.prod(_state["shape"])), dtype, buffer=_state["shm"].buf)
+    elif kind == "file":
+        _state["buffer"] = np.load(ref, mmap_mode="r+").reshape(-1)
+
+
+def _release():
+    _state["buffer"] = None  # drop the view before closing the block under it
+    if "shm" in _state:
+        _state["shm"].close()
+    _state.clear()
+
+
+def _chunk_stats(values, start):
+    finite = np.isfinite(values)
+    count = int(finite.sum())
+    if count == 0:
+        return {"count": 0}
+    v = values[finite]
+    mean = v.mean()
+    lo = np.where(finite, values, np.inf).argmin()
+    hi = np.where(finite, values, -np.inf).argmax()
+    return {"count": count, "mean": mean, "m2": ((v - mean) ** 2).sum(),
+            "min": values[lo], "max": values[hi], "argmin": start + lo, "argmax": start + hi}
+
+
+def _merge(a, b):
+    # Chan et al. pairwise update of count, mean and sum of squared deviations
+    if a["count"] == 0:
+        return b
+    if b["count"] == 0:
+        return a
+    count = a["count"] + b["count"]
+    delta = b["mean"] - a["mean"]
+    merged = {"count": count, "mean": a["mean"] + delta * b["count"] / count,
+              "m2": a["m2"] + b["m2"] + delta**2 * a["count"] * b["count"] / count}
+    lo, hi = (a if a["min"] <= b["min"] else b), (a if a["max"] >= b["max"] else b)
+    merged.update(min=lo["min"], argmin=lo["argmin"], max=hi["max"], argmax=hi["argmax"])
+    return merged
+
+
+def _run_chunk(start, stop):
+    s = _state
+    columns = dict(s["fixed"])
+    index = np.unravel_index(np.arange(start, stop), s["shape"])
+    for (key, values), i in zip(s["axes"].items(), index):
+        columns[key] = values[i]
+    results = evaluate(s["model"], columns)
+
+    stats = {}
+    for key in s["outputs"]:
+        values = np.broadcast_to(np.asarray(results[key], dtype=float), (stop - start,))
+        if s["buffer"] is not None:
+            s["buffer"][key][start:stop] = values
+        stats[key] = _chunk_stats(values, start)
+    return stats
+
+
+def _point(axes, flat):
+    index = np.unravel_index(flat, tuple(len(values) for values in axes.values()))
+    return {key: values[i].item() for (key, values), i in zip(axes.items(), index)}
+
+
+def sweep(model, grid, fixed=None, output=None, workers=None, chunk_size=CHUNK_SIZE):
+    """Evaluate `model` on every combination of the grid's input values.
+
+    grid maps swept inputs to their values and fixed maps the remaining
+    inputs to one value each (unlisted inputs take the UI defaults).
+    output=None only summarizes; "memory" also returns the results as a
+    structured array of the grid's shape, one float field per numeric
+    output; a path writes that array to a .npy file instead and returns it
+    memory-mapped. workers defaults to the CPU count; 1 runs in-process.
+
+    Returns (summary, results). summary maps each numeric output to its
+    count of finite values, mean, std, min and max, and the grid point
+    (input -> value) of the min and max.
+    """
+    spec = model_spec(model)
+    fixed = dict(fixed or {})
+    unknown = (set(grid) | set(fixed)) - set(spec["inputs"])
+    if unknown:
+        raise ValueError(f"Unknown {model} input(s) {sorted(unknown)}; "
+                         f"expected {list(spec['inputs'])}")
+    axes = {key: np.asarray(values) for key, values in grid.items()}
+    if any(values.ndim != 1 or values.size == 0 for values in axes.values()):
+        raise ValueError("Every grid input needs a non-empty 1-D list of values")
+    shape = tuple(len(values) for values in axes.values())
+    points = int(np.prod(shape))
+
+    # String outputs (the PRV status) are left out of the buffers and summary
+    probe = evaluate(model, {**fixed, **{key: values[:1] for key, values in axes.items()}})
+    outputs = [key for key in spec["outputs"] if np.asarray(probe[key]).dtype.kind in "biuf"]
+    dtype = np.dtype([(key, "f8") for key in outputs])
+
+    shm = None
+    if output is None:
+        target = (None, None)
+    elif output == "memory":
+        shm = SharedMemory(create=True, size=max(points * dtype.itemsize, 1))
+        target = ("memory", shm.name)
+    else:
+        np.lib.format.open_memmap(output, mode="w+", dtype=dtype, shape=shape).flush()
+        target = ("file", output)
+
+    args = (model, axes, fixed, outputs, target)
+    starts = list(range(0, points, chunk_size))
+    stops = [min(start + chunk_size, points) for start in starts]
+    totals = dict.fromkeys(outputs, {"count": 0})
+    workers = workers or os.cpu_count() or 1
+    try:
+        if workers <= 1:
+            _init(*args)
+            for stats in map(_run_chunk, starts, stops):
+                totals = {key: _merge(totals[key], stats[key]) for key in outputs}
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init, initargs=args) as pool:
+                for stats in pool.map(_run_chunk, starts, stops):
+                    totals = {key: _merge(totals[key], stats[key]) for key in outputs}
+
+        if output is None:
+            results = None
+        elif output == "memory":
+            results = np.ndarray(shape, dtype, buffer=shm.buf).copy()
+        else:
+            results = np.load(output, mmap_mode="r")
+    finally:
+        if workers <= 1:
+            _release()
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    summary = {}
+    for key, t in totals.items():
+        if t["count"] == 0:
+            summary[key] = {"count": 0}
+            continue
+        summary[key] = {"count": t["count"], "mean": float(t["mean"]),
+                        "std": float(np.sqrt(t["m2"] / t["count"])),
+                        "min": float(t["min"]), "max": float(t["max"]),
+                        "argmin": _point(axes, t["argmin"]), "argmax": _point(axes, t["argmax"])}
+    return summary, results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m kohler_model.sweep",
+                                     description="Full-factorial model sweep over a process pool.")
+    parser.add_argument("model", help="model to sweep (see python -m kohler_model --list)")
+    parser.add_argument("grid", help="JSON file mapping inputs to value lists")
+    parser.add_argument("--fixed", help="JSON file mapping other inputs to one value each")
+    parser.add_argument("-o", "--output", help=".npy file for every point's outputs "
+                                               "(default: summary only)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="grid points per task")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        with open(args.grid, encoding="utf-8") as f:
+            grid = json.load(f)
+        fixed = {}
+        if args.fixed:
+            with open(args.fixed, encoding="utf-8") as f:
+                fixed = json.load(f)
+        summary, _ = sweep(args.model, grid, fixed, args.output, args.workers, args.chunk_size)
+    except (ValueError, OSError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    json.dump(summary, sys.stdout, indent=1, ensure_ascii=False)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Anthem thermostatic valve: per-outlet temperature drop after the mixer.
+
+The drop curves are data: DROP_TABLE holds, per setting and outlet type,
+the drop at each of the LENGTHS_FT breakpoints plus the slope beyond the
+last one. Evaluation is one vectorized pass for any mix of outlets,
+lengths, settings and attached flags.
+"""
+import numpy as np
+
+OUTLET_TYPES = ['Spout', 'Handshower', 'Showerhead', 'Rain Panel', 'Body Jet -1', 'Body Jet -2']
+MIXING = "A (Mixing)"
+ATTACHED_DROP = 0.8  # °C extra drop with a product attached
+
+LENGTHS_FT = [0, 2, 4, 6]
+# setting -> outlet -> (drop in °C at LENGTHS_FT, slope in °C/ft beyond the last length);
+# None stands for any other setting / outlet type
+DROP_TABLE = {
+    MIXING: {
+        'Spout': ([0, 0.6, 1.2, 1.8], 0.3),
+        'Handshower': ([0, 1, 2, 2], 0),
+        'Showerhead': ([1, 1.2, 1.9, 3.1], 0),
+        'Rain Panel': ([0, 0.16, 0.32, 0.48], 0.08),
+        'Body Jet -1': ([0, 1, 2, 3], 0.5),
+        'Body Jet -2': ([0, 1, 2, 3], 0.5),
+        None: ([0, 1, 2, 3], 0.5),
+    },
+    None: {
+        'Spout': ([0, 0.6, 1.2, 1.8], 0.3),
+        'Handshower': ([0, 2.7, 3.5, 3.5], 0),
+        'Showerhead': ([1, 1.2, 1.9, 3.1], 0),
+        'Rain Panel': ([0, 1.3, 1.3, 1.3], 0),
+        'Body Jet -1': ([0, 1.2, 2.4, 3.6], 0.6),
+        'Body Jet -2': ([0, 1.2, 2.4, 3.6], 0.6),
+        None: ([0, 1.2, 2.4, 3.6], 0.6),
+    },
+}
+
+# Flattened curves: row = setting block * outlets + outlet position
+_SETTINGS = list(DROP_TABLE)
+_OUTLETS = OUTLET_TYPES + [None]
+_X = np.array(LENGTHS_FT, dtype=float)
+_DROPS = np.array([DROP_TABLE[s][o][0] for s in _SETTINGS for o in _OUTLETS], dtype=float)
+_TAILS = np.array([DROP_TABLE[s][o][1] for s in _SETTINGS for o in _OUTLETS], dtype=float)
+_SLOPES = np.diff(_DROPS, axis=1) / np.diff(_X)
+
+
+def _codes(values, keys):
+    # Position of each value in keys (the trailing None matches anything else)
+    if isinstance(values, str):
+        return keys.index(values) if values in keys else len(keys) - 1
+    values = np.asarray(values)
+    names, inverse = np.unique(values, return_inverse=True)
+    codes = np.array([keys.index(n) if n in keys else len(keys) - 1 for n in names.tolist()])
+    return codes[inverse].reshape(values.shape)
+
+
+def get_temp_drop(outlet, len_ft, setting, is_attached):
+    """Temperature drop (°C) from the valve to an outlet on len_ft (>= 0) of
+    pipe. Every argument may be an array; they broadcast together."""
+    curve = _codes(setting, _SETTINGS) * len(_OUTLETS) + _codes(outlet, _OUTLETS)
+    x = np.maximum(np.asarray(len_ft, dtype=float), _X[0])
+    segment = np.clip(np.searchsorted(_X, x, side="right") - 1, 0, len(_X) - 2)
+
+    deltaT = _DROPS[curve, segment] + _SLOPES[curve, segment] * (np.minimum(x, _X[-1]) - _X[segment])
+    deltaT = deltaT + _TAILS[curve] * np.maximum(x - _X[-1], 0)
+    return (deltaT + np.where(is_attached, ATTACHED_DROP, 0.0))[()]
+
+
+def outlet_temps(T_hot, T_cold, mix_ratio, outlets, len_ft, setting=MIXING, is_attached=True):
+    """Valve mixed temperature and the temperature at each outlet (°C).
+
+    outlets is the list of outlet types of one Anthem configuration and
+    len_ft their pipe lengths (ft), with the outlets on the last axis; the
+    mix inputs broadcast over leading axes, so a sweep of mix ratios times
+    lengths is one call. Returns (T_mix, outlet_temp) where outlet_temp
+    has a trailing outlet axis.
+    """
+    T_mix = (np.asarray(mix_ratio, dtype=float) * np.asarray(T_hot, dtype=float)
+             + (1 - np.asarray(mix_ratio, dtype=float)) * np.asarray(T_cold, dtype=float))
+    delta_T = get_temp_drop(outlets, len_ft, setting, is_attached)
+    return T_mix[()], (T_mix[..., None] - delta_T)[()]
@@ -0,0 +1,220 @@
+"""Monte Carlo tolerance analysis of the faucet and valve engines.
+
+Each sample is one unit: its cartridge or valve parameters and its supply
+conditions are drawn from the given distributions and the vectorized
+engine evaluates all of them at once, chunk by chunk, so memory stays
+bounded however many units are drawn. The result is the yield against an
+output spec plus mean, spread and percentiles of every output.
+
+    from kohler_model import monte_carlo
+
+    mc = monte_carlo("faucet", {"A_max": ("normal", 7e-3, 0.1e-3),
+                                "hot_pressure": ("uniform", 1.2, 1.8)},
+                     spec={"flow_LPM": (8.0, None)}, n=1_000_000)
+    mc["yield"], mc["percentiles"]["flow_LPM"][5]
+
+Inputs may also be arrays (e.g. a lever angle sweep): every unit is then
+evaluated at every point, the outputs get percentile bands per point and a
+unit only passes when it meets the spec at all of them.
+"""
+import numpy as np
+
+from .api import MODELS
+from .faucet import C_D, cartridge_area, faucet_mix
+from .valve import _PARAM_KEYS, calculate_valve, valve_params
+
+# name -> draw of `size` samples from the distribution's parameters
+DISTRIBUTIONS = {
+    "normal": lambda rng, size, mean, sd: rng.normal(mean, sd, size),
+    "uniform": lambda rng, size, low, high: rng.uniform(low, high, size),
+    "triangular": lambda rng, size, low, mode, high: rng.triangular(low, mode, high, size),
+}
+
+CHUNK_SIZE = 100_000
+BINS = 6000  # histogram bins per output and point, spanning 3x the first chunk's range
+PERCENTILES = (1, 5, 50, 95, 99)
+
+
+def _run_faucet(c):
+    T_mixed, flow_LPM = faucet_mix(c["hot_temp"], c["cold_temp"], c["hot_pressure"],
+                                   c["cold_pressure"], c["lever_angle"], C_d=c["C_d"],
+                                   A_max=c["A_max"])
+    return {"T_mixed": T_mixed, "flow_LPM": flow_LPM}
+
+
+def _run_valve(c):
+    params = {key: c[key] for key in _PARAM_KEYS}
+    return calculate_valve(c["hotP"], c["coldP"], c["hotT"], c["coldT"], c["theta"],
+                           c["outletChoice"], c["pipeLen"], c["pipeDia"], model=params)
+
+
+# model -> input naming the device, the device's nominal parameters and runner
+ENGINES = {
+    "faucet": {
+        "device": "cartridge",
+        "nominal": lambda cartridge: {"A_max": cartridge_area(cartridge), "C_d": C_D},
+        "run": _run_faucet,
+    },
+    "valve": {
+        "device": "model",
+        "nominal": lambda model: dict(valve_params(model)),
+        "run": _run_valve,
+    },
+}
+
+
+def _draw(rng, dist, size):
+    if isinstance(dist, (int, float)):
+        return np.full(size, float(dist))
+    kind, *args = dist
+    if kind not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution {kind!r}; expected one of {list(DISTRIBUTIONS)}")
+    return DISTRIBUTIONS[kind](rng, size, *args)
+
+
+class _Histogram:
+    """Streaming count, mean, spread and percentiles of one output per point."""
+
+    def __init__(self, first, bins):
+        lo = np.nanmin(first, axis=0)
+        hi = np.nanmax(first, axis=0)
+        span = np.where(hi > lo, hi - lo, np.maximum(np.abs(lo), 1.0) * 1e-6)
+        self.bins = bins
+        self.lo = lo - span
+        self.width = 3 * span / bins
+        points = first.shape[1]
+        # per point: underflow, bins, overflow
+        self.counts = np.zeros(points * (bins + 2), dtype=np.int64)
+        self.min = np.full(points, np.inf)
+        self.max = np.full(points, -np.inf)
+        self.sum = np.zeros(points)
+        self.sumsq = np.zeros(points)
+        self.n = np.zeros(points, dtype=np.int64)
+
+    def add(self, values):
+        finite = np.isfinite(values)
+        idx = np.clip(np.floor((values - self.lo) / self.width) + 1, 0, self.bins + 1)
+        codes = np.arange(values.shape[1]) * (self.bins + 2) + np.where(finite, idx, 0).astype(np.int64)
+        self.counts += np.bincount(codes[finite], minlength=self.counts.size)
+        clean = np.where(finite, values, 0.0)
+        self.n += finite.sum(axis=0)
+        self.sum += clean.sum(axis=0)
+        self.sumsq += (clean**2).sum(axis=0)
+        self.min = np.minimum(self.min, np.where(finite, values, np.inf).min(axis=0))
+        self.max = np.maximum(self.max, np.where(finite, values, -np.inf).max(axis=0))
+
+    def mean(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.sum / self.n
+
+    def std(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(np.maximum(self.sumsq / self.n - self.mean() ** 2, 0))
+
+    def percentile(self, q):
+        # Linear within the bin holding the q-th value; the under- and
+        # overflow bins report the exact min and max seen
+        counts = self.counts.reshape(-1, self.bins + 2)
+        cum = np.cumsum(counts, axis=1)
+        target = q / 100 * self.n
+        b = np.minimum((cum < target[:, None]).sum(axis=1), self.bins + 1)
+        rows = np.arange(len(b))
+        before = np.where(b > 0, cum[rows, np.maximum(b - 1, 0)], 0)
+        in_bin = counts[rows, b]
+        frac = np.where(in_bin > 0, (target - before) / np.maximum(in_bin, 1), 0.0)
+        value = self.lo + (b - 1 + frac) * self.width
+        value = np.where(b == 0, self.min, np.where(b == self.bins + 1, self.max, value))
+        value = np.clip(value, self.min, self.max)
+        return np.where(self.n > 0, value, np.nan)
+
+
+def monte_carlo(model, tolerances, spec=None, inputs=None, n=1_000_000, chunk_size=CHUNK_SIZE,
+                percentiles=PERCENTILES, seed=None, bins=BINS):
+    """Yield and output distribution of `model` ("faucet" or "valve") over n units.
+
+    tolerances maps a parameter to its distribution: ("normal", mean, sd),
+    ("uniform", low, high), ("triangular", low, mode, high) or a constant.
+    Parameters are the model's inputs (as in MODELS) and its device
+    parameters: A_max and C_d for the faucet, the VALVES keys (D_throat,
+    K_inlet, K_cart, K_out_spout, ...) for the valve. Anything not listed
+    keeps its nominal value from `inputs`, the UI defaults and the chosen
+    cartridge / valve model.
+
+    spec maps an output to its (low, high) limits, None for an open end.
+    Returns a dict with n, yield (fraction of units inside every limit at
+    every point), point_yield, failures (units outside each output's
+    limits) and mean, std and percentiles (percentile -> value) per output.
+    Percentiles come from a streaming histogram of `bins` bins over three
+    times the first chunk's range, so they resolve to about 1/2000 of it.
+    """
+    if model not in ENGINES:
+        raise ValueError(f"Unknown model {model!r}; expected one of {list(ENGINES)}")
+    engine = ENGINES[model]
+    outputs = MODELS[model]["outputs"]
+    inputs = dict(inputs or {})
+    spec = dict(spec or {})
+
+    fixed = {key: value for key, value in MODELS[model]["inputs"].items()
+             if key != engine["device"]}
+    unknown = set(inputs) - set(MODELS[model]["inputs"])
+    if unknown:
+        raise ValueError(f"Unknown {model} input(s) {sorted(unknown)}; "
+                         f"expected {list(MODELS[model]['inputs'])}")
+    device = inputs.pop(engine["device"], MODELS[model]["inputs"][engine["device"]])
+    fixed.update(engine["nominal"](device))
+    for key, value in inputs.items():
+        fixed[key] = value if isinstance(value, str) else np.asarray(value, dtype=float)
+
+    unknown = (set(tolerances) - set(fixed)) | (set(spec) - set(outputs))
+    if unknown:
+        raise ValueError(f"Unknown {model} parameter(s) or output(s) {sorted(unknown)}; "
+                         f"parameters are {list(fixed)}, outputs {outputs}")
+
+    point_shape = np.broadcast_shapes(*(np.shape(v) for v in fixed.values()
+                                        if not isinstance(v, str)))
+    points = int(np.prod(point_shape))
+    rng = np.random.default_rng(seed)
+
+    passed = 0
+    point_passed = np.zeros(points, dtype=np.int64)
+    failures = dict.fromkeys(spec, 0)
+    histograms = {}
+    for start in range(0, n, chunk_size):
+        m = min(chunk_size, n - start)
+        c = dict(fixed)
+        for key, dist in tolerances.items():
+            c[key] = _draw(rng, dist, m).reshape((m,) + (1,) * len(point_shape))
+        results = engine["run"](c)
+
+        ok = np.ones((m, points), dtype=bool)
+        values = {}
+        for key in outputs:
+            values[key] = np.broadcast_to(np.asarray(results[key], dtype=float),
+                                          (m,) + point_shape).reshape(m, points)
+            if key not in histograms:
+                histograms[key] = _Histogram(values[key], bins)
+            histograms[key].add(values[key])
+        for key, (low, high) in spec.items():
+            inside = np.isfinite(values[key])
+            if low is not None:
+                inside &= values[key] >= low
+            if high is not None:
+                inside &= values[key] <= high
+            failures[key] += int((~inside.all(axis=1)).sum())
+            ok &= inside
+        passed += int(ok.all(axis=1).sum())
+        point_passed += ok.sum(axis=0)
+
+    def shaped(a):
+        return np.asarray(a).reshape(point_shape)[()]
+
+    return {
+        "n": n,
+        "yield": passed / n,
+        "point_yield": shaped(point_passed / n),
+        "failures": failures,
+        "mean": {key: shaped(h.mean()) for key, h in histograms.items()},
+        "std": {key: shaped(h.std()) for key, h in histograms.items()},
+        "percentiles": {key: {q: shaped(h.percentile(q)) for q in percentiles}
+                        for key, h in histograms.items()},
+    }
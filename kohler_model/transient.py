@@ -0,0 +1,266 @@
+"""Time-domain pipe temperatures: hot-water arrival and lever-step response.
+
+The steady models take the pipe outlet as the mixed temperature less a
+fixed drop; here the water in a pipe is followed in time. The pipe is cut
+into `cells` equal cells, each holding the water and a lumped wall (the
+EPDM tube and vinyl jacket of try1.m, with their thicknesses kept at any
+bore). Every time step
+
+1. water and wall exchange heat through the inner film and the EPDM, and
+   the wall loses heat through the vinyl and outer film to the room: the
+   resistance network of hose.py, split at the EPDM/vinyl interface. Both
+   exchanges use their exact exponential decay over the step, and
+2. the water moves v·dt along the pipe, rounded to whole cells with the
+   remainder carried to the next step, so a hot front travels at the right
+   speed without numerical smearing and any step size is stable. The
+   outlet temperature is the mean of the cells that leave.
+
+Water therefore exchanges for as many steps as it spends in the pipe, and
+at any step size the settled outlet matches hose_heat_loss (without
+try1.m's fixed 0.2537 °C offset) while the drop along the pipe is small;
+over longer runs the loss here falls off with the water temperature. Flows and film coefficients are
+worked out for all steps up front, so the loop only updates preallocated
+arrays; batches of scenarios run together along the leading axes. A 60 s
+transient at 0.05 s steps over 200 cells takes about 18 ms, and a batch of
+a hundred scenarios about 3 ms each.
+
+Inputs that may change over time (inlet temperature, flow, lever angle)
+broadcast to (*batch, steps): a time series along the last axis, or a
+trailing axis of length 1 for a per-scenario constant. schedule() builds
+the piecewise-constant series of a lever step.
+"""
+import numpy as np
+
+from .hose import H_OUT, K_EPDM, K_VINYL, R_EPDM, R_INNER, R_OUTER, film_coefficient
+from .valve import _is_shower, _mix_density, valve_mixer, valve_params
+from .water import water_properties, water_property
+
+DURATION = 60.0  # s
+DT = 0.05        # s
+CELLS = 200
+
+# Wall layer thicknesses (m) of the try1.m hose, kept at any bore
+WALL_EPDM = R_EPDM - R_INNER
+WALL_VINYL = R_OUTER - R_EPDM
+# Volumetric heat capacities (J/m³K)
+RHO_CP_EPDM = 1100 * 2000
+RHO_CP_VINYL = 1300 * 1400
+
+
+def _steps(duration, dt):
+    return max(int(round(duration / dt)), 1)
+
+
+def schedule(times, values, duration=DURATION, dt=DT):
+    """Piecewise-constant series over a transient's steps.
+
+    values[..., j] holds from times[j] (s) until the next time; before
+    times[0] the first value holds. E.g. schedule([0, 5], [-45, 0]) moves
+    the lever from full hot to the middle at 5 s.
+    """
+    t = np.arange(_steps(duration, dt)) * dt
+    index = np.maximum(np.searchsorted(np.asarray(times, dtype=float), t, side="right") - 1, 0)
+    return np.asarray(values)[..., index]
+
+
+def arrival_time(t, T, threshold):
+    """First time in t at which the series T (last axis) reaches threshold; NaN if never."""
+    reached = np.asarray(T) >= np.asarray(threshold)[..., None]
+    first = reached.argmax(axis=-1)
+    return np.where(reached.any(axis=-1), np.asarray(t)[first], np.nan)[()]
+
+
+def pipe_transient(T_in, flow_LPM, length, diameter, T_room=25.0, T_init=None,
+                   duration=DURATION, dt=DT, cells=CELLS):
+    """Water and wall temperatures along a pipe over `duration` s.
+
+    T_in (°C) and flow_LPM are the inlet conditions, per step (see the
+    module docstring); length (m), diameter (bore, mm), T_room and T_init
+    (°C) are per scenario. T_init is the starting temperature of the
+    standing water and wall (default T_room), or "steady" for the settled
+    profile of the first step's conditions. Returns a dict with the step
+    end times t (s), the outlet temperature T_out (*batch, steps) and the
+    final water and wall profiles T_pipe and T_wall (*batch, cells).
+    """
+    steps = _steps(duration, dt)
+    T_in = np.asarray(T_in, dtype=float)
+    Q = np.asarray(flow_LPM, dtype=float) / 60000
+    L = np.asarray(length, dtype=float)
+    D = np.asarray(diameter, dtype=float) / 1000
+    T_room = np.asarray(T_room, dtype=float)
+    steady = isinstance(T_init, str) and T_init == "steady"
+    T_init = T_room if T_init is None or steady else np.asarray(T_init, dtype=float)
+
+    batch = np.broadcast_shapes(T_in.shape[:-1], Q.shape[:-1], L.shape, D.shape,
+                                T_room.shape, T_init.shape)
+    B = int(np.prod(batch))
+
+    def per_step(x):
+        return np.broadcast_to(x, batch + (steps,)).reshape(B, steps)
+
+    def per_scenario(x):
+        return np.broadcast_to(x, batch).reshape(B, 1)
+
+    T_in, Q = per_step(T_in), per_step(Q)
+    L, D, T_room, T_init = (per_scenario(x) for x in (L, D, T_room, T_init))
+
+    # --- Per-step coefficients ---
+    r1 = D / 2
+    r2 = r1 + WALL_EPDM
+    r3 = r2 + WALL_VINYL
+    area = np.pi * r1**2
+    props = water_properties(T_in)
+    v = Q / area
+    Re = props["rho"] * np.abs(v) * D / props["mu"]
+    Pr = props["cp"] * props["mu"] / props["k"]
+    h_in = film_coefficient(Re, Pr, props["k"], D)
+
+    # heat capacities (J/K) and conductances (W/K) per metre
+    C_f = props["rho"] * props["cp"] * area
+    C_w = np.pi * ((r2**2 - r1**2) * RHO_CP_EPDM + (r3**2 - r2**2) * RHO_CP_VINYL)
+    G_fw = 2 * np.pi / (1 / (h_in * r1) + np.log(r2 / r1) / K_EPDM)
+    G_wa = 2 * np.pi / (np.log(r3 / r2) / K_VINYL + 1 / (H_OUT * r3))
+
+    # Whole cells moved per step, carrying the remainder on, so fronts keep
+    # their shape; more than the whole pipe in one step just refills it
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shift = np.where(L > 0, np.minimum(np.abs(v) * dt * cells / L, cells), cells)
+    moved = np.floor(np.cumsum(shift, axis=1) + 1e-9)
+    k = np.minimum(np.diff(moved, axis=1, prepend=0.0), cells).astype(np.intp)
+    k_all = np.where((k == k[:1]).all(axis=0), k[0], -1)  # one shift for the whole batch
+
+    # Water exchanges heat only while it is in the pipe: for less than a step
+    # when the plug passes straight through, and not at all in a zero-length pipe
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_exchange = np.where(L > 0, np.minimum(dt, L / np.abs(v)), 0.0)
+    decay = 1 - np.exp(-t_exchange * G_fw * (1 / C_f + 1 / C_w))
+    a_f = decay * C_w / (C_f + C_w)
+    # ...while the wall meets every plug that passes during the step, not just
+    # the one kept in the cells: dt / t_exchange of them in turn
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plugs = np.where(t_exchange > 0, dt / t_exchange, 1.0)
+    a_w = 1 - (1 - decay * C_f / (C_f + C_w)) ** plugs
+    room = np.exp(-dt * G_wa / C_w)
+
+    # --- Initial state ---
+    x = (np.arange(cells) + 0.5) / cells * L
+    if steady:
+        # settled water and wall under the first step's inflow
+        G = G_fw[:, :1] * G_wa / (G_fw[:, :1] + G_wa)
+        mcp = C_f[:, :1] * np.abs(v[:, :1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            decay_x = np.where(mcp > 0, np.exp(-x * G / mcp), 0.0)
+        T_f = T_room + (T_in[:, :1] - T_room) * decay_x
+        T_w = (G_fw[:, :1] * T_f + G_wa * T_room) / (G_fw[:, :1] + G_wa)
+    else:
+        T_f = np.broadcast_to(T_init, (B, cells)).copy()
+        T_w = T_f.copy()
+
+    # --- Stepper ---
+    pad = int(k.max()) + 1
+    ext = np.empty((B, pad + cells))
+    flat = ext.reshape(-1)
+    source = np.arange(B)[:, None] * (pad + cells) + pad + np.arange(cells)
+    offset = T_room * (1 - room)
+    T_out = np.empty((B, steps))
+    d = np.empty((B, cells))
+    q = np.empty((B, cells))
+    index = np.empty((B, cells), dtype=np.intp)
+    rows = np.arange(B)
+    last = np.maximum(k - 1, 0)  # from the outlet end: the last cell leaving per step
+    leaving = np.empty((B, pad - 1))
+    through = (k >= cells).any(axis=0)
+
+    def passed(n):
+        return T_in[:, n] - (T_in[:, n] - T_w.mean(axis=1)) * a_f[:, n]
+
+    for n in range(steps):
+        # Exchange, then move the water on, so water exchanges for the steps
+        # it spends in the pipe and not also for the one in which it enters
+        np.subtract(T_f, T_w, out=d)
+        T_f -= np.multiply(d, a_f[:, n:n + 1], out=q)
+        T_w += np.multiply(d, a_w[:, n:n + 1], out=q)
+        T_w *= room
+        T_w += offset
+
+        # Outlet: the mean of the cells leaving this step, or the last cell
+        # of standing water; a plug that passes straight through leaves in
+        # the step it enters, after its exchange
+        m = k_all[n]
+        if m < 0:
+            np.cumsum(T_f[:, :-pad:-1], axis=1, out=leaving)
+            T_out[:, n] = np.where(k[:, n] > 0, leaving[rows, last[:, n]] / np.maximum(k[:, n], 1),
+                                   T_f[:, -1])
+            ext[:, :pad] = T_in[:, n:n + 1]
+            ext[:, pad:] = T_f
+            np.subtract(source, k[:, n:n + 1], out=index)
+            np.take(flat, index, out=T_f)
+            if through[n]:
+                T_out[:, n] = np.where(k[:, n] >= cells, passed(n), T_out[:, n])
+        elif m >= cells:
+            T_f[:] = T_in[:, n:n + 1]
+            T_out[:, n] = passed(n)
+        elif m > 0:
+            T_out[:, n] = T_f[:, -m:].mean(axis=1)
+            T_f[:, m:] = T_f[:, :-m]
+            T_f[:, :m] = T_in[:, n:n + 1]
+        else:
+            T_out[:, n] = T_f[:, -1]
+
+    return {
+        "t": np.arange(1, steps + 1) * dt,
+        "T_out": T_out.reshape(batch + (steps,)),
+        "T_pipe": T_f.reshape(batch + (cells,)),
+        "T_wall": T_w.reshape(batch + (cells,)),
+    }
+
+
+def valve_transient(hotP, coldP, hotT, coldT, theta, outletChoice, pipeLen, pipeDia,
+                    model="AT360", hotLen=0.0, hotDia=None, T_room=25.0, start="cold",
+                    duration=DURATION, dt=DT, cells=CELLS):
+    """Outlet temperature over time as the lever moves and hot water arrives.
+
+    Inputs as calculate_valve, per scenario, except theta, which may be a
+    time series (see schedule()). hotLen and hotDia (m, mm; hotDia defaults
+    to pipeDia) are the hot supply line ahead of the valve, which delivers
+    hotT from its far end. start="cold" begins with both lines standing
+    at T_room; "steady" with them settled at the first step's lever angle.
+    The valve itself responds instantly; flows use the supply densities.
+
+    Returns labelled series of shape (*batch, steps) and "Time (s)".
+    """
+    steps = _steps(duration, dt)
+    hotT = np.asarray(hotT, dtype=float)
+    coldT = np.asarray(coldT, dtype=float)
+    hotDia = pipeDia if hotDia is None else hotDia
+    T_init = "steady" if start == "steady" else None
+
+    def per_scenario(x):
+        return np.asarray(x)[..., None]
+
+    p = {key: per_scenario(value) for key, value in valve_params(model).items()}
+    theta = np.asarray(theta, dtype=float)
+    if theta.ndim == 0:
+        theta = theta[..., None]
+    rho_hot = water_property("rho", hotT)
+    rho_cold = water_property("rho", coldT)
+    Q_out, _, hot_share, cold_share = valve_mixer(
+        per_scenario(hotP), per_scenario(coldP), theta, per_scenario(_is_shower(outletChoice)),
+        p, per_scenario(rho_hot), per_scenario(rho_cold))
+    flow_LPM = Q_out * 60000
+
+    # Hot supply line, then the mixed stream down the outlet pipe
+    hot_line = pipe_transient(per_scenario(hotT), hot_share * flow_LPM, hotLen, hotDia, T_room,
+                              T_init, duration, dt, cells)
+    T_hot = hot_line["T_out"]
+    T_mix = hot_share * T_hot + cold_share * per_scenario(coldT)
+    outlet = pipe_transient(T_mix, flow_LPM, pipeLen, pipeDia, T_room, T_init, duration, dt, cells)
+
+    shape = np.broadcast_shapes(outlet["T_out"].shape, np.shape(flow_LPM))
+    return {
+        "Time (s)": outlet["t"],
+        "Valve Outlet Flow (LPM)": np.broadcast_to(flow_LPM, shape),
+        "Hot Inlet Temperature (°C)": np.broadcast_to(T_hot, shape),
+        "Mixed Water Temperature (°C)": np.broadcast_to(T_mix, shape),
+        "Final Pipe Temperature (°C)": outlet["T_out"],
+    }
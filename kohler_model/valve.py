@@ -0,0 +1,165 @@
+"""Diverter valve mixer model for the Aqua Turbo valves.
+
+The valve geometry and loss coefficients live in the VALVES table; every
+input of calculate_valve may be a scalar or a NumPy array (including the
+outlet choice and the valve model), and all of them broadcast together.
+"""
+import numpy as np
+
+from .friction import pipe_pressure_drop
+from .water import water_property
+
+# Per-valve geometry (m) and loss coefficients
+VALVES = {
+    "AT235": {
+        "D_throat": 0.0051,
+        "D_outlet": 0.0127,
+        "K_inlet": 0.17,
+        "K_cart": 0.65,
+        "K_out_spout": 0.2,
+        "K_out_shower": 0.2,
+    },
+    "AT360": {
+        "D_throat": 0.007,
+        "D_outlet": 0.0127,
+        "K_inlet": 0.17,
+        "K_cart": 0.67,
+        "K_out_spout": 0.2,
+        "K_out_shower": 0.2,
+    },
+}
+
+RHO = 1000      # kg/m³, default when no inlet densities are given
+G = 9.81        # m/s²
+F_PIPE = 0.009  # fixed friction factor, kept for the quadratic pipe edges of the network solver
+PIPE_ROUGHNESS = 1.5e-6  # m, drawn copper / PEX tubing
+Q_MIN = 1e-6    # m³/s, floor on the mixing denominator
+
+_PARAM_KEYS = list(VALVES["AT360"])
+
+
+def valve_params(model):
+    """Parameter dict for a valve name, or per-point arrays for an array of names.
+
+    A dict with the VALVES keys is taken as the parameters themselves, so
+    callers can pass their own (possibly per-point) geometry.
+    """
+    if isinstance(model, dict):
+        return model
+    if isinstance(model, str):
+        if model not in VALVES:
+            raise ValueError(f"Unknown valve {model!r}; expected one of {list(VALVES)}")
+        return VALVES[model]
+
+    models = np.asarray(model)
+    names, inverse = np.unique(models, return_inverse=True)
+    unknown = [n for n in names.tolist() if n not in VALVES]
+    if unknown:
+        raise ValueError(f"Unknown valve {unknown}; expected one of {list(VALVES)}")
+    return {
+        key: np.array([VALVES[n][key] for n in names.tolist()])[inverse].reshape(models.shape)
+        for key in _PARAM_KEYS
+    }
+
+
+def _is_shower(outletChoice):
+    if isinstance(outletChoice, str):
+        return outletChoice.lower() == "shower"
+    outlets = np.asarray(outletChoice)
+    names, inverse = np.unique(outlets, return_inverse=True)
+    flags = np.array([str(n).lower() == "shower" for n in names.tolist()], dtype=bool)
+    return flags[inverse].reshape(outlets.shape)
+
+
+def _mix_density(hot_share, cold_share, rho_hot, rho_cold):
+    # Volume-weighted density of the mixed stream (mean of the inlets when nothing flows)
+    shares = hot_share + cold_share
+    flowing = shares > 0
+    return np.where(flowing, (hot_share * rho_hot + cold_share * rho_cold) / np.where(flowing, shares, 1.0),
+                    0.5 * (rho_hot + rho_cold))
+
+
+def valve_mixer(hotP, coldP, theta, shower, model="AT360", rho_hot=RHO, rho_cold=RHO):
+    """Cartridge stage of the valve: (Q_out m³/s, P_out Pa, hot share, cold share).
+
+    The shares are Q_hot/Q_total and Q_cold/Q_total, so the mixed
+    temperature is hot_share * hotT + cold_share * coldT. shower is a bool
+    (or bool array) selecting the shower outlet loss; rho_hot and rho_cold
+    are the inlet densities (kg/m³).
+    """
+    p = valve_params(model)
+
+    A_throat = np.pi * (np.asarray(p["D_throat"]) / 2) ** 2
+    A_outlet = np.pi * (np.asarray(p["D_outlet"]) / 2) ** 2
+    K_cart = np.asarray(p["K_cart"])
+    K_in = p["K_inlet"] + K_cart
+
+    lever = (np.asarray(theta, dtype=float) + 45) / 90
+    P_hot = np.asarray(hotP, dtype=float) * 1e5
+    P_cold = np.asarray(coldP, dtype=float) * 1e5
+
+    Q_hot = (1 - lever) * A_throat * np.sqrt((2 * P_hot) / (rho_hot * K_in))
+    Q_cold = lever * A_throat * np.sqrt((2 * P_cold) / (rho_cold * K_in))
+    Q_total = np.maximum(Q_hot + Q_cold, Q_MIN)
+    hot_share = Q_hot / Q_total
+    cold_share = Q_cold / Q_total
+
+    P_mix = hot_share * P_hot + cold_share * P_cold
+    rho_mix = _mix_density(hot_share, cold_share, rho_hot, rho_cold)
+
+    K_total = K_cart + np.where(shower, p["K_out_shower"], p["K_out_spout"])
+    Q_out = A_throat * np.sqrt((2 * P_mix) / (rho_mix * K_total))
+
+    v_out = Q_out / A_outlet
+    P_out = P_mix - 0.5 * rho_mix * v_out**2
+    return Q_out, P_out, hot_share, cold_share
+
+
+def valve_results(Q_out, P_out, T_mix, shower, pipeLen, pipeDia, rho=RHO,
+                  roughness=PIPE_ROUGHNESS):
+    """Pipe stage after the valve, returned as the labelled results dict.
+
+    The pipe friction factor follows the pipe's Reynolds number (viscosity
+    at T_mix) and relative roughness, see friction.py.
+    """
+    L_pipe = np.asarray(pipeLen, dtype=float)
+    D_pipe = np.asarray(pipeDia, dtype=float) / 1000
+
+    # Pipe Pressure Drop
+    mu = water_property("mu", T_mix)
+    DeltaP_pipe = pipe_pressure_drop(Q_out, L_pipe, D_pipe, rho, mu, roughness)
+    # vertical lift only for shower
+    DeltaP_pipe = np.where(shower, DeltaP_pipe + rho * G * L_pipe, DeltaP_pipe * 0.05)
+
+    P_pipe_out = np.maximum(P_out - DeltaP_pipe, 0)
+    T_pipe_out = T_mix - 0.2 * L_pipe
+
+    flow_LPM = Q_out * 1000 * 60
+    return {
+        "Valve Outlet Flow (LPM)": flow_LPM[()],
+        "Valve Outlet Pressure (bar)": (P_out / 1e5)[()],
+        "Mixed Water Temperature (°C)": T_mix[()],
+        "Final Pipe Flow (LPM)": flow_LPM[()],
+        "Final Pipe Pressure (bar)": (P_pipe_out / 1e5)[()],
+        "Final Pipe Temperature (°C)": T_pipe_out[()],
+    }
+
+
+def calculate_valve(hotP, coldP, hotT, coldT, theta, outletChoice, pipeLen, pipeDia,
+                    model="AT360"):
+    """Valve outlet and end-of-pipe flow, pressure and temperature.
+
+    Pressures in bar, temperatures in °C, theta in degrees (-45 = full hot,
+    +45 = full cold), pipeLen in m and pipeDia in mm. outletChoice is
+    'Spout' or 'Shower'. Water densities follow the inlet temperatures.
+    Returns the same labelled dict as the valve pages, holding arrays when
+    any input is an array.
+    """
+    shower = _is_shower(outletChoice)
+    rho_hot = water_property("rho", hotT)
+    rho_cold = water_property("rho", coldT)
+    Q_out, P_out, hot_share, cold_share = valve_mixer(hotP, coldP, theta, shower, model,
+                                                      rho_hot, rho_cold)
+    T_mix = hot_share * np.asarray(hotT, dtype=float) + cold_share * np.asarray(coldT, dtype=float)
+    rho_mix = _mix_density(hot_share, cold_share, rho_hot, rho_cold)
+    return valve_results(Q_out, P_out, T_mix, shower, pipeLen, pipeDia, rho_mix)
@@ -0,0 +1,142 @@
+"""Temperature-dependent water properties shared by every model.
+
+The property table is loaded once per process into one sorted array and
+served by linear interpolation in temperature; temperatures outside the
+table take the nearest end row, and NaN or infinite ones give NaN. This
+replaces both the exact-match row lookup of Water_Data.xlsx in try1.m
+(which silently fell back to fixed constants between rows) and the
+per-model density constants.
+
+By default the built-in saturated-water table is used. Point the
+KOHLER_WATER_DATA environment variable at a CSV or .xlsx file laid out
+like Water_Data.xlsx (columns T (°C), rho (kg/m³), mu (Pa·s), k (W/m·K)
+and optionally cp (J/kg·K); header rows are skipped) to use your own.
+Lookups on a uniformly spaced table index the row directly; any other
+table uses a binary search. Every property comes from the same index.
+"""
+import functools
+import os
+
+import numpy as np
+
+PROPERTIES = ["rho", "mu", "k", "cp"]
+ENV_VAR = "KOHLER_WATER_DATA"
+
+# Saturated liquid water at 1 atm: T (°C), rho (kg/m³), mu (Pa·s), k (W/m·K), cp (J/kg·K)
+_BUILTIN = np.array([
+    [0.0, 999.84, 1.792e-3, 0.5610, 4217.6],
+    [5.0, 999.97, 1.519e-3, 0.5705, 4205.0],
+    [10.0, 999.70, 1.307e-3, 0.5800, 4192.1],
+    [15.0, 999.10, 1.138e-3, 0.5893, 4185.5],
+    [20.0, 998.21, 1.002e-3, 0.5984, 4181.8],
+    [25.0, 997.05, 0.890e-3, 0.6071, 4179.6],
+    [30.0, 995.65, 0.798e-3, 0.6154, 4178.4],
+    [35.0, 994.03, 0.719e-3, 0.6233, 4178.3],
+    [40.0, 992.22, 0.653e-3, 0.6305, 4178.5],
+    [45.0, 990.21, 0.596e-3, 0.6372, 4180.0],
+    [50.0, 988.04, 0.547e-3, 0.6435, 4181.3],
+    [55.0, 985.69, 0.504e-3, 0.6490, 4183.3],
+    [60.0, 983.20, 0.467e-3, 0.6543, 4184.9],
+    [65.0, 980.55, 0.434e-3, 0.6590, 4187.6],
+    [70.0, 977.76, 0.404e-3, 0.6631, 4189.7],
+    [75.0, 974.84, 0.378e-3, 0.6668, 4192.9],
+    [80.0, 971.79, 0.355e-3, 0.6700, 4196.4],
+    [85.0, 968.61, 0.334e-3, 0.6728, 4200.5],
+    [90.0, 965.31, 0.315e-3, 0.6753, 4205.0],
+    [95.0, 961.89, 0.298e-3, 0.6773, 4210.1],
+    [100.0, 958.35, 0.282e-3, 0.6791, 4215.7],
+])
+
+
+class WaterTable:
+    """Sorted property table with linear interpolation in temperature."""
+
+    def __init__(self, rows):
+        rows = np.asarray(rows, dtype=float)
+        if rows.ndim != 2 or rows.shape[1] not in (4, 5) or len(rows) < 2:
+            raise ValueError("A water table needs at least two rows of T, rho, mu, k[, cp]")
+        rows = rows[np.argsort(rows[:, 0], kind="stable")]
+        if rows.shape[1] == 4:  # no cp column, as in Water_Data.xlsx
+            rows = np.column_stack([rows, np.interp(rows[:, 0], _BUILTIN[:, 0], _BUILTIN[:, 4])])
+
+        self.T = rows[:, 0].copy()
+        steps = np.diff(self.T)
+        if np.any(steps <= 0):
+            raise ValueError("Water table temperatures must be distinct")
+        self.values = rows[:, 1:].copy()
+        self.slopes = np.diff(self.values, axis=0) / steps[:, None]
+        self.step = steps[0] if np.allclose(steps, steps[0]) else None
+
+    def _row(self, T):
+        if self.step is not None:
+            i = ((T - self.T[0]) / self.step).astype(np.intp)
+        else:
+            i = np.searchsorted(self.T, T, side="right") - 1
+        # np.minimum/np.maximum rather than np.clip, which costs several µs per scalar call
+        return np.minimum(np.maximum(i, 0), len(self.T) - 2)
+
+    def lookup(self, temp, names=PROPERTIES):
+        """Dict of the named properties at temp (°C, scalar or array)."""
+        temp = np.asarray(temp, dtype=float)
+        # np.fmax/np.fmin put NaN on the first row, so the index cast is always
+        # defined; non-finite temperatures are then masked to NaN properties
+        T = np.fmin(np.fmax(temp, self.T[0]), self.T[-1])
+        i = self._row(T)
+        dT = T - self.T[i]
+        finite = np.isfinite(temp)
+        if not finite.all():
+            dT = np.where(finite, dT, np.nan)
+        out = {}
+        for name in names:
+            j = PROPERTIES.index(name)
+            out[name] = (self.values[i, j] + self.slopes[i, j] * dT)[()]
+        return out
+
+
+def _read_rows(path):
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        try:
+            import openpyxl
+        except ImportError as exc:
+            raise ImportError("Reading .xlsx water tables needs openpyxl: pip install openpyxl") from exc
+        sheet = openpyxl.load_workbook(path, read_only=True, data_only=True).active
+        rows = [row[:5] for row in sheet.iter_rows(values_only=True)]
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = [line.split(",")[:5] for line in f if line.strip()]
+
+    numeric = []
+    for row in rows:
+        try:
+            values = [float(v) for v in row if v not in (None, "")]
+        except (TypeError, ValueError):
+            continue  # header or note row
+        if len(values) >= 4:
+            numeric.append(values[:5])
+    width = min(len(values) for values in numeric) if numeric else 0
+    return [values[:width] for values in numeric]
+
+
+def load_table(path):
+    """WaterTable read from a CSV or .xlsx file."""
+    return WaterTable(_read_rows(path))
+
+
+@functools.lru_cache(maxsize=None)
+def water_table():
+    """The process-wide WaterTable, loaded on first use."""
+    path = os.environ.get(ENV_VAR)
+    return load_table(path) if path else WaterTable(_BUILTIN)
+
+
+def water_properties(temp):
+    """rho (kg/m³), mu (Pa·s), k (W/m·K) and cp (J/kg·K) at temp (°C,
+    scalar or array), returned as a dict."""
+    return water_table().lookup(temp)
+
+
+def water_property(name, temp):
+    """One property ('rho', 'mu', 'k' or 'cp') at temp (°C)."""
+    if name not in PROPERTIES:
+        raise ValueError(f"Unknown water property {name!r}; expected one of {PROPERTIES}")
+    return water_table().lookup(temp, (name,))[name]
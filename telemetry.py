@@ -0,0 +1,113 @@
+"""Per-rerun latency spans for the Streamlit app.
+
+Every rerun of home.py is one record: the page it rendered, its total
+time and named spans for the phases inside it (asset loading, imports,
+model math, charts, gauges). Whatever no span covers is layout and widget
+work and is reported as "other". Records are appended as JSON lines to
+timings.jsonl, or the file named by KOHLER_TIMING_LOG (set it empty to
+turn the file off), and the session's last reruns feed the ?debug=1 panel.
+"""
+from collections import defaultdict, deque
+from contextlib import contextmanager
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+
+import streamlit as st
+
+LOG_PATH = os.environ.get("KOHLER_TIMING_LOG", "timings.jsonl")
+KEEP = 50  # reruns kept per session for the debug panel
+
+_write_lock = threading.Lock()
+
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except ImportError:
+        return None
+    return ctx.session_id if ctx else None
+
+
+class Rerun:
+    """Timing spans of one script run; create it at the top of the script."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.page = None
+        self.spans = defaultdict(float)
+        self.record = None
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name] += (time.perf_counter() - start) * 1000
+
+    def timed(self, func, name):
+        """func wrapped so every call counts towards span `name`."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def finish(self):
+        """Close the record, log it and keep it for the debug panel (once per rerun)."""
+        if self.record is not None:
+            return self.record
+        total = (time.perf_counter() - self.start) * 1000
+        spans = dict(self.spans)
+        spans["other"] = max(total - sum(spans.values()), 0.0)
+        record = {
+            "time": datetime.datetime.now().isoformat(timespec="milliseconds"),
+            "session": _session_id(),
+            "page": self.page or st.session_state.get("page"),
+            "total_ms": round(total, 3),
+            "spans_ms": {name: round(ms, 3) for name, ms in spans.items()},
+        }
+        if LOG_PATH:
+            line = json.dumps(record) + "\n"
+            with _write_lock, open(LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(line)
+        if "timings" not in st.session_state:
+            st.session_state.timings = deque(maxlen=KEEP)
+        st.session_state.timings.append(record)
+        self.record = record
+        return record
+
+
+class TimedModels:
+    """Proxy over the session's model functions that times every call."""
+
+    def __init__(self, models, rerun, name="model math"):
+        self._models = models
+        self._rerun = rerun
+        self._name = name
+
+    def __getattr__(self, attr):
+        value = getattr(self._models, attr)
+        return self._rerun.timed(value, self._name) if callable(value) else value
+
+
+def summary(records):
+    """Median and worst time per page and span over the given records."""
+    grouped = defaultdict(lambda: defaultdict(list))
+    for record in records:
+        grouped[record["page"]]["total"].append(record["total_ms"])
+        for name, ms in record["spans_ms"].items():
+            grouped[record["page"]][name].append(ms)
+    rows = []
+    for page, spans in grouped.items():
+        for name, values in spans.items():
+            values = sorted(values)
+            rows.append({"page": page, "span": name, "reruns": len(values),
+                         "median ms": round(values[len(values) // 2], 1),
+                         "max ms": round(values[-1], 1)})
+    return rows
@@ -0,0 +1,23 @@
+import pytest
+
+from kohler_model.hose import DT_OFFSET, hose_heat_loss
+from kohler_model.transient import pipe_transient
+
+
+def settled_outlet(dt):
+    # 1.5 m of the try1.m hose (4.5 mm bore) at 8 LPM, started from its settled profile
+    return pipe_transient(50.0, 8.0, 1.5, 4.5, 25.0, T_init="steady", dt=dt)["T_out"][-1]
+
+
+def test_settled_outlet_matches_hose_heat_loss_at_default_dt():
+    expected = hose_heat_loss(50.0, 25.0, 1.5, 8.0)["T_out"] + DT_OFFSET
+    assert settled_outlet(0.05) == pytest.approx(expected, abs=1e-3)
+
+
+@pytest.mark.parametrize("dt", [0.01, 0.2, 1.0])
+def test_settled_outlet_does_not_depend_on_step_size(dt):
+    assert settled_outlet(dt) == pytest.approx(settled_outlet(0.05), abs=1e-3)
+
+
+def test_zero_length_pipe_passes_inlet_through():
+    assert (pipe_transient(60.0, 8.0, 0.0, 4.5, 25.0)["T_out"] == 60.0).all()